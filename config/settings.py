@@ -14,6 +14,7 @@ class Settings(BaseSettings):
     GALLABOX_CHANNEL_ID: str
     VERIFY_TOKEN: str
     GALLABOX_WEBHOOK_SECRET: Optional[str] = None
+    GALLABOX_BULK_ENDPOINT: Optional[str] = None  # e.g. /devapi/messages/whatsapp/bulk
 
     # ===========================
     # 📱 TWILIO CREDENTIALS
@@ -49,6 +50,9 @@ class Settings(BaseSettings):
     WHATSAPP_WABA_ID: Optional[str] = None
     WHATSAPP_QUALITY: Optional[str] = None
     WHATSAPP_MESSAGE_LIMIT: Optional[int] = None
+    WHATSAPP_MPS: float = 20.0  # outbound messages per second (broadcast pacing)
+    BROADCAST_CONCURRENCY: int = 10
+    BROADCAST_BATCH_SIZE: int = 50
 
     # ===========================
     # 🤖 OPENAI/GPT CONFIG
@@ -65,6 +69,9 @@ class Settings(BaseSettings):
     JIRA_EMAIL: str
     JIRA_API_TOKEN: str
     JIRA_PROJECT_KEY: str
+    OPTIMISTIC_JIRA_ACK: bool = False  # reply before Jira confirms update/close
+    JIRA_MAX_CONCURRENCY: int = 5  # Jira REST calls in flight at once
+    JIRA_MAX_RPS: float = 10.0  # Jira REST calls per second (Atlassian Cloud throttles bursts)
 
     # ===========================
     # ☁️ AWS CONFIG
@@ -88,6 +95,8 @@ class Settings(BaseSettings):
     RATE_LIMIT_WINDOW_MS: int = 900000
     RATE_LIMIT_MAX_REQUESTS: int = 100
     WEBHOOK_URL: Optional[str] = None
+    LOG_SAMPLE_MPS_THRESHOLD: float = 20.0  # sample send logs above this rate
+    LOG_SAMPLE_RATE: int = 100  # log 1 in N sends when sampling
     COMPANY_NAME: str = "Sothebys Real Estate"
     
     JWT_SECRET: Optional[str] = None
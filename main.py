@@ -57,6 +57,10 @@ async def lifespan(app: FastAPI):
         projects = await jira_service.get_all_projects()
         print(f"   ✅ Loaded {len(projects)} projects")
     
+    # Start messaging background workers (bound to the running loop)
+    app.state.gallabox = gallabox_service
+    await gallabox_service.start()
+    
     print("\n" + "="*70)
     print("✅ System Ready - Listening for webhooks")
     print("="*70 + "\n")
@@ -68,6 +72,10 @@ async def lifespan(app: FastAPI):
     print("🛑 WhatsApp Support Agent - Shutting Down")
     print("="*70)
     
+    # Flush queued WhatsApp messages
+    print("\n📬 Flushing message queue...")
+    await gallabox_service.shutdown()
+    
     # Export analytics
     print("\n📊 Exporting analytics...")
     analytics = analytics_service.export_analytics()
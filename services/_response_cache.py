@@ -0,0 +1,47 @@
+"""
+In-process response cache
+Small LRU cache with per-entry expiry for reusable bot replies
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import time
+
+
+class TTLCache:
+    """LRU cache whose entries expire after `ttl` seconds"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self._cache: OrderedDict = OrderedDict()
+        self._maxsize = maxsize
+        self._ttl = ttl
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get cached value (None if missing or expired)"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            return None
+        
+        # Move to end (LRU)
+        self._cache.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any):
+        """Store value, evicting the least recently used entry at capacity"""
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        elif len(self._cache) >= self._maxsize:
+            self._cache.popitem(last=False)
+        
+        self._cache[key] = (time.monotonic() + self._ttl, value)
+    
+    def clear(self):
+        self._cache.clear()
+    
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -680,7 +680,7 @@ class ConversationMemoryService:
                 for msg in session.messages
             ],
             "property_requirements": session.current_property_requirements.dict() if session.current_property_requirements else None,
-            "lead_score": session.lead_score.dict() if session.lead_score else None,
+            "lead_score": session.lead_score.to_dict() if session.lead_score else None,
             "is_vip": session.is_vip,
             "vip_tier": session.vip_tier,
             "topics_discussed": session.topics_discussed,
@@ -5,24 +5,42 @@ Production-grade with media handling, templates, rate limiting, and monitoring
 """
 
 import httpx
+import aiofiles
 import asyncio
 from config.settings import settings
 from services.cost_tracker import cost_tracker
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Tuple, Union
 import json
 from datetime import datetime, timedelta
 import os
 import tempfile
 import logging
+import time
 from enum import Enum
-from collections import deque, defaultdict
+from collections import deque, defaultdict, ChainMap
 import hashlib
+import functools
+from itertools import islice
 import mimetypes
 from urllib.parse import urlparse
 import base64
 
 logger = logging.getLogger(__name__)
 
+# Fast JSON (orjson) with stdlib fallback
+try:
+    import orjson
+    
+    def _json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode()
+    
+    _json_loads = json.loads
+
 # ==========================================
 # ENUMS & CONSTANTS
 # ==========================================
@@ -51,78 +69,204 @@ class DeliveryStatus(str, Enum):
     FAILED = "failed"
     PENDING = "pending"
 
+# MIME type -> file extension for downloaded media
+_MIME_MAP: Dict[str, str] = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "application/pdf": ".pdf",
+    "application/msword": ".doc",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+    "application/vnd.ms-excel": ".xls",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": ".xlsx",
+    "video/mp4": ".mp4",
+    "audio/mpeg": ".mp3",
+    "audio/ogg": ".ogg"
+}
+
+# Real estate message templates (bound format_map, parsed once at import)
+_PROPERTY_DETAILS_MESSAGE = """🏠 **{name}**
+
+📍 Location: {location}
+💰 Price: {price}
+🛏️ Bedrooms: {bedrooms}
+🚿 Bathrooms: {bathrooms}
+📐 Size: {size_sqft:,} sq ft
+
+Would you like to schedule a viewing?""".format_map
+
+_VIEWING_CONFIRMATION_MESSAGE = """✅ **Viewing Confirmed**
+
+🏠 Property: {property_name}
+📅 Date: {date}
+⏰ Time: {time}
+
+👤 Agent: {agent_name}
+📞 Contact: {agent_phone}
+
+We look forward to showing you this property!""".format_map
+
+_CONTRACT_READY_MESSAGE = """📄 **Contract Ready for Review**
+
+Dear {buyer_name},
+
+Your purchase contract for **{property}** is ready.
+
+Please review the documents attached and let us know if you have any questions.
+
+{company_name}""".format_map
+
+@functools.lru_cache(maxsize=512)
+def _button_pairs(buttons: tuple) -> tuple:
+    """Normalize (id, title) pairs for reply buttons (title max 20 chars)"""
+    return tuple((button_id, title[:20]) for button_id, title in buttons)
+
+def _format_buttons(buttons: tuple) -> List[Dict[str, Any]]:
+    """Format (id, title) pairs as WhatsApp reply buttons"""
+    # Cache only the immutable pairs - each payload gets its own dicts
+    return [
+        {
+            "type": "reply",
+            "reply": {
+                "id": button_id,
+                "title": title
+            }
+        }
+        for button_id, title in _button_pairs(buttons)
+    ]
+
 # ==========================================
 # MESSAGE QUEUE FOR BULK SENDING
 # ==========================================
 
 class MessageQueue:
-    """Asynchronous message queue with priority"""
+    """Asynchronous priority message queue drained by a persistent worker pool"""
     
-    def __init__(self, max_concurrent: int = 5):
-        self._queue: deque = deque()
-        self._processing = False
-        self._max_concurrent = max_concurrent
+    def __init__(self, max_workers: int = 16, maxsize: int = 10_000):
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=maxsize)
+        self._max_workers = max_workers
+        self._workers: List[asyncio.Task] = []
+        self._send_function = None
+        self._sequence = 0  # FIFO tie-breaker within the same priority
         self._stats = {
             "queued": 0,
             "sent": 0,
             "failed": 0
         }
     
-    def add(self, message: Dict, priority: int = 5):
+    def start(self, send_function):
+        """Spawn long-lived consumers (idempotent, requires a running loop)"""
+        if self._workers:
+            return
+        
+        self._send_function = send_function
+        self._workers = [
+            asyncio.create_task(self._consume())
+            for _ in range(self._max_workers)
+        ]
+        logger.info(f"📬 Message queue started with {self._max_workers} workers")
+    
+    async def add(self, message: Dict, priority: int = 5):
         """Add message to queue (priority 1-10, 10 = highest)"""
-        self._queue.append({
+        self._sequence += 1
+        await self._queue.put((-priority, self._sequence, {
             "message": message,
             "priority": priority,
             "queued_at": datetime.now(),
             "retries": 0
-        })
+        }))
         self._stats["queued"] += 1
     
-    async def process(self, send_function):
-        """Process queue with concurrent sending"""
-        if self._processing:
-            return
-        
-        self._processing = True
-        
-        while self._queue:
-            # Sort by priority
-            sorted_queue = sorted(
-                self._queue, 
-                key=lambda x: x["priority"], 
-                reverse=True
-            )
-            self._queue = deque(sorted_queue)
-            
-            # Process batch
-            batch = []
-            for _ in range(min(self._max_concurrent, len(self._queue))):
-                if self._queue:
-                    batch.append(self._queue.popleft())
-            
-            # Send concurrently
-            tasks = [send_function(**item["message"]) for item in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Track results
-            for result, item in zip(results, batch):
-                if isinstance(result, Exception):
-                    self._stats["failed"] += 1
-                    logger.error(f"Queue send failed: {result}")
-                    
-                    # Retry logic
-                    if item["retries"] < 3:
-                        item["retries"] += 1
-                        self._queue.append(item)
-                else:
-                    self._stats["sent"] += 1
-            
-            await asyncio.sleep(1)  # Rate limiting
-        
-        self._processing = False
+    async def _consume(self):
+        """Worker loop - pull one message at a time and send it"""
+        while True:
+            _, _, item = await self._queue.get()
+            try:
+                await self._send_function(**item["message"])
+                self._stats["sent"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.error(f"Queue send failed: {e}")
+                
+                # Retry logic
+                if item["retries"] < 3:
+                    item["retries"] += 1
+                    self._sequence += 1
+                    try:
+                        self._queue.put_nowait((-item["priority"], self._sequence, item))
+                    except asyncio.QueueFull:
+                        logger.error("Queue full - dropping retry")
+            finally:
+                self._queue.task_done()
+    
+    async def join(self):
+        """Wait until every queued message has been processed"""
+        await self._queue.join()
+    
+    async def shutdown(self):
+        """Drain the queue, then stop the workers"""
+        if self._workers:
+            await self._queue.join()
+        
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
     
     def get_stats(self) -> Dict:
-        return self._stats.copy()
+        stats = self._stats.copy()
+        stats["pending"] = self._queue.qsize()
+        stats["workers"] = len(self._workers)
+        return stats
+
+# ==========================================
+# TOKEN BUCKET PACING
+# ==========================================
+
+class TokenBucket:
+    """Async token bucket for proactive outbound pacing"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self._rate = rate  # tokens per second
+        self._capacity = capacity or rate
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0  # monotonic time until which no tokens are handed out
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+    
+    async def acquire(self):
+        """Wait for and consume one token"""
+        async with self._lock:
+            while True:
+                blocked_for = self._blocked_until - time.monotonic()
+                if blocked_for > 0:
+                    await asyncio.sleep(blocked_for)
+                    continue
+                
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+    
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next `seconds` (e.g. Retry-After)"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+    
+    def update(self, remaining: int, reset_in: Optional[float] = None):
+        """Sync with the server-reported quota (X-RateLimit-* headers)"""
+        self._refill()
+        self._tokens = min(self._tokens, max(remaining, 0))
+        if remaining <= 0 and reset_in:
+            self.pause(reset_in)
 
 # ==========================================
 # DELIVERY TRACKING
@@ -165,6 +309,17 @@ class DeliveryTracker:
             for key in oldest_keys:
                 del self._status_map[key]
     
+    def evict_older_than(self, max_age_seconds: float) -> int:
+        """Drop entries created more than max_age_seconds ago"""
+        cutoff = datetime.now() - timedelta(seconds=max_age_seconds)
+        stale = [
+            message_id for message_id, entry in self._status_map.items()
+            if entry["created_at"] < cutoff
+        ]
+        for message_id in stale:
+            del self._status_map[message_id]
+        return len(stale)
+    
     def get_status(self, message_id: str) -> Optional[Dict]:
         """Get message status"""
         return self._status_map.get(message_id)
@@ -175,6 +330,53 @@ class DeliveryTracker:
             return 0.0
         return sum(self._delivery_times) / len(self._delivery_times)
 
+# ==========================================
+# BROADCAST RESULTS
+# ==========================================
+
+class BroadcastDetails:
+    """
+    Per-recipient broadcast outcomes stored column-wise
+    
+    Keeps phones, a success bytearray and errors side by side instead of a
+    dict per recipient while a broadcast runs; send_broadcast hands callers
+    the plain list-of-dicts via to_list().
+    """
+    
+    __slots__ = ("phones", "ok", "errors")
+    
+    def __init__(self):
+        self.phones: List[str] = []
+        self.ok = bytearray()
+        self.errors: List[Optional[str]] = []
+    
+    def append(self, phone: str, success: bool, error: Optional[str] = None):
+        self.phones.append(phone)
+        self.ok.append(1 if success else 0)
+        self.errors.append(error)
+    
+    @property
+    def sent(self) -> int:
+        return sum(self.ok)
+    
+    def __len__(self) -> int:
+        return len(self.phones)
+    
+    def __iter__(self):
+        for phone, ok, error in zip(self.phones, self.ok, self.errors):
+            yield {"phone": phone, "success": bool(ok), "error": error}
+    
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return {
+            "phone": self.phones[index],
+            "success": bool(self.ok[index]),
+            "error": self.errors[index]
+        }
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Materialize the list-of-dicts form (e.g. for JSON responses)"""
+        return list(self)
+
 # ==========================================
 # MAIN GALLABOX SERVICE
 # ==========================================
@@ -207,38 +409,61 @@ class GallaboxService:
             "Content-Type": "application/json"
         }
         
-        # Circuit breaker
+        # Circuit breaker (monotonic clock; lock only taken on state edges)
         self._failure_count = 0
         self._circuit_open = False
-        self._last_failure_time = None
+        self._last_failure_time: Optional[float] = None
+        self._last_failure_iso: Optional[str] = None  # formatted once per failure
         self._max_failures = 5
         self._circuit_timeout = 60
+        self._circuit_lock = asyncio.Lock()
         
-        # Rate limiting (per user)
-        self._user_message_times: Dict[str, deque] = defaultdict(lambda: deque(maxlen=20))
+        # Rate limiting (per user) - monotonic timestamps in a sliding window
+        self._user_message_times: Dict[str, deque] = defaultdict(deque)
         self._rate_limit_window = 60  # seconds
         self._rate_limit_max = 10  # messages per window
         
         # Global rate limiting
-        self._global_message_times: deque = deque(maxlen=100)
+        self._global_message_times: deque = deque()
         self._global_rate_limit = 50  # messages per minute
         
+        # Broadcast pacing
+        self._broadcast_sem = asyncio.Semaphore(settings.BROADCAST_CONCURRENCY)
+        self._bucket = TokenBucket(rate=settings.WHATSAPP_MPS)
+        
+        # Success-log sampling (see _log_sent): sends counted per 1s window
+        self._sent_log_counter = 0
+        self._sent_window_start = time.monotonic()
+        self._sent_window_count = 0
+        self._sent_per_second = 0.0
+        
         # Retry configuration
         self._max_retries = 3
         self._retry_delay_base = 2
         
-        # Message queue
-        self._message_queue = MessageQueue(max_concurrent=5)
+        # Message queue (persistent worker pool, started on first use)
+        self._message_queue = MessageQueue(max_workers=16)
         
         # Delivery tracking
         self._delivery_tracker = DeliveryTracker()
         
+        # Background garbage collection of per-user / per-message state
+        self._gc_interval = 300  # seconds
+        self._delivery_ttl = 24 * 3600  # seconds
+        self._gc_task: Optional[asyncio.Task] = None
+        
+        # Duplicate-send suppression: (phone, payload digest) -> monotonic time
+        self._recent_sends: Dict[tuple, float] = {}
+        self._dedup_window = 5  # seconds
+        
         # Template cache
         self._template_cache: Dict[str, Dict] = {}
         
-        # HTTP client pool
+        # Per-request timeout for API calls
         self._client_timeout = httpx.Timeout(30.0, connect=10.0)
-        self._limits = httpx.Limits(max_keepalive_connections=10, max_connections=20)
+        
+        # Shared keep-alive client used by every request (created lazily once an event loop exists)
+        self._client: Optional[httpx.AsyncClient] = None
         
         # Supported media types
         self._supported_media = {
@@ -247,36 +472,119 @@ class GallaboxService:
             "video": [".mp4", ".3gp", ".mov"],
             "audio": [".mp3", ".ogg", ".aac", ".m4a", ".amr"]
         }
+        self._ext_to_media_type = {
+            ext: media_type
+            for media_type, exts in self._supported_media.items()
+            for ext in exts
+        }
         
         logger.info(f"🚀 Advanced Gallabox service initialized")
     
+    # ==========================================
+    # LIFECYCLE & BACKGROUND TASKS
+    # ==========================================
+    
+    async def start(self):
+        """Start background workers (call from app startup)"""
+        self._message_queue.start(self._send_queued_text)
+        self._ensure_gc_task()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared pooled HTTP client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(60.0),
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=200),
+                http2=True
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.shutdown()
+    
+    def _ensure_gc_task(self):
+        """Start the GC loop once an event loop is running"""
+        if self._gc_task is None or self._gc_task.done():
+            self._gc_task = asyncio.create_task(self._gc_loop())
+    
+    async def _gc_loop(self):
+        """Periodically evict idle rate-limit buckets and old delivery records"""
+        while True:
+            await asyncio.sleep(self._gc_interval)
+            try:
+                self._collect_garbage()
+            except Exception as e:
+                logger.error(f"❌ Gallabox GC error: {e}")
+    
+    def _collect_garbage(self):
+        """Single GC sweep"""
+        now = time.monotonic()
+        
+        idle_users = [
+            phone for phone, user_times in list(self._user_message_times.items())
+            if not user_times or now - user_times[-1] > self._rate_limit_window
+        ]
+        for phone in idle_users:
+            del self._user_message_times[phone]
+        
+        evicted = self._delivery_tracker.evict_older_than(self._delivery_ttl)
+        
+        cutoff = time.monotonic() - self._dedup_window
+        for key in [k for k, sent_at in self._recent_sends.items() if sent_at < cutoff]:
+            del self._recent_sends[key]
+        
+        if idle_users or evicted:
+            logger.info(f"🧹 Gallabox GC: {len(idle_users)} idle users, {evicted} delivery records evicted")
+    
     # ==========================================
     # CIRCUIT BREAKER & RATE LIMITING
     # ==========================================
     
-    def _check_circuit_breaker(self) -> bool:
+    async def _check_circuit_breaker(self) -> bool:
         """Check circuit breaker status"""
+        # Lock-free read on the common (closed) path
         if not self._circuit_open:
             return True
         
-        if self._last_failure_time:
-            elapsed = (datetime.now() - self._last_failure_time).seconds
+        if self._last_failure_time is not None:
+            elapsed = time.monotonic() - self._last_failure_time
             if elapsed > self._circuit_timeout:
-                self._circuit_open = False
-                self._failure_count = 0
-                logger.info("✅ Circuit breaker reset")
+                async with self._circuit_lock:
+                    # Another request may have already closed the circuit
+                    if self._circuit_open:
+                        self._circuit_open = False
+                        self._failure_count = 0
+                        logger.info("✅ Circuit breaker reset")
                 return True
         
         logger.warning("⚠️ Circuit breaker is OPEN - blocking request")
         return False
     
-    def _record_failure(self):
+    async def _record_failure(self):
         """Record API failure"""
-        self._failure_count += 1
-        if self._failure_count >= self._max_failures:
-            self._circuit_open = True
-            self._last_failure_time = datetime.now()
-            logger.error(f"🔴 Circuit breaker OPENED after {self._failure_count} failures")
+        if self._failure_count + 1 < self._max_failures:
+            self._failure_count += 1
+            return
+        
+        # Crossing the threshold - serialize the CLOSED -> OPEN transition
+        async with self._circuit_lock:
+            self._failure_count += 1
+            self._last_failure_time = time.monotonic()
+            self._last_failure_iso = datetime.now().isoformat()
+            if not self._circuit_open:
+                self._circuit_open = True
+                logger.error(f"🔴 Circuit breaker OPENED after {self._failure_count} failures")
     
     def _record_success(self):
         """Record successful API call"""
@@ -285,7 +593,7 @@ class GallaboxService:
     
     def _check_user_rate_limit(self, phone: str) -> bool:
         """Check per-user rate limit"""
-        now = datetime.now().timestamp()
+        now = time.monotonic()
         
         # Remove old timestamps
         user_times = self._user_message_times[phone]
@@ -294,16 +602,30 @@ class GallaboxService:
         
         # Check limit
         if len(user_times) >= self._rate_limit_max:
-            logger.warning(f"⚠️ Rate limit exceeded for {phone}")
+            logger.warning("⚠️ Rate limit exceeded for %s", phone)
             return False
         
         # Add current timestamp
         user_times.append(now)
         return True
     
+    async def _acquire_user_slot(self, phone: str):
+        """Wait until the per-user rate limit has room, then take a slot"""
+        while True:
+            now = time.monotonic()
+            user_times = self._user_message_times[phone]
+            while user_times and now - user_times[0] > self._rate_limit_window:
+                user_times.popleft()
+            
+            if len(user_times) < self._rate_limit_max:
+                user_times.append(now)
+                return
+            
+            await asyncio.sleep(self._rate_limit_window - (now - user_times[0]))
+    
     def _check_global_rate_limit(self) -> bool:
         """Check global rate limit"""
-        now = datetime.now().timestamp()
+        now = time.monotonic()
         
         # Remove old timestamps
         while self._global_message_times and now - self._global_message_times[0] > 60:
@@ -317,10 +639,58 @@ class GallaboxService:
         self._global_message_times.append(now)
         return True
     
+    def _apply_rate_limit_headers(self, response: httpx.Response):
+        """Feed X-RateLimit-Remaining / X-RateLimit-Reset back into the bucket"""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        
+        try:
+            remaining = int(remaining)
+            reset = float(response.headers.get("X-RateLimit-Reset", 0))
+        except ValueError:
+            return
+        
+        # Reset may be an epoch timestamp or a delta in seconds
+        reset_in = reset - time.time() if reset > 1_000_000_000 else reset
+        self._bucket.update(remaining, max(reset_in, 0))
+    
+    @staticmethod
+    def _parse_retry_after(response: httpx.Response, default: int = 5) -> int:
+        """Parse Retry-After (seconds); fall back to default for dates/garbage"""
+        try:
+            return int(response.headers.get("Retry-After", default))
+        except ValueError:
+            return default
+    
+    def _log_sent(self, msg: str, *args):
+        """Lazy success log for send paths; sampled 1-in-N under high throughput"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
+        # Measure actual send throughput (every send path logs through here)
+        now = time.monotonic()
+        elapsed = now - self._sent_window_start
+        if elapsed >= 1.0:
+            self._sent_per_second = self._sent_window_count / elapsed
+            self._sent_window_start = now
+            self._sent_window_count = 0
+        self._sent_window_count += 1
+        
+        if self._sent_per_second >= settings.LOG_SAMPLE_MPS_THRESHOLD:
+            self._sent_log_counter += 1
+            if self._sent_log_counter % settings.LOG_SAMPLE_RATE:
+                return
+        
+        logger.info(msg, *args)
+    
     async def _wait_for_rate_limit(self):
         """Wait if rate limit is hit"""
+        # Proactive pacing, kept in sync with the API's rate-limit headers
+        await self._bucket.acquire()
+        
         if not self._check_global_rate_limit():
-            wait_time = 60 - (datetime.now().timestamp() - self._global_message_times[0])
+            wait_time = 60 - (time.monotonic() - self._global_message_times[0])
             if wait_time > 0:
                 logger.info(f"⏳ Waiting {wait_time:.1f}s for rate limit reset")
                 await asyncio.sleep(wait_time)
@@ -333,126 +703,187 @@ class GallaboxService:
         self,
         endpoint: str,
         payload: Dict,
-        retry_count: Optional[int] = None
+        retry_count: Optional[int] = None,
+        body: Optional[bytes] = None,
+        queued: bool = False
     ) -> Dict[str, Any]:
         """
         Core API call with retry logic and error handling
+        
+        Duplicate sends are suppressed before any rate-limit slot is taken;
+        everything else takes the recipient's per-user slot (queued sends
+        wait for one instead of failing) and the global pacing.
+        
+        `body` may carry the payload already serialized (sorted keys) to skip
+        re-encoding, e.g. for broadcasts.
         """
-        if not self._check_circuit_breaker():
+        self._ensure_gc_task()
+        
+        if not await self._check_circuit_breaker():
             return {
                 "success": False,
                 "error": "Service temporarily unavailable (circuit breaker open)"
             }
         
+        # Serialize once - reused for dedup key and across retries
+        if body is None:
+            body = _json_dumps(payload, sort_keys=True)
+        
+        # Coalesce identical sends to the same recipient within the window
+        recipient = payload["recipient"]["phone"]
+        dedup_key = (recipient, hashlib.blake2b(body, digest_size=16).digest())
+        now = time.monotonic()
+        if self._recent_sends.get(dedup_key, 0) > now - self._dedup_window:
+            logger.info("♻️ Duplicate send to %s suppressed", recipient)
+            return {
+                "success": True,
+                "deduped": True,
+                "status": "deduplicated"
+            }
+        self._recent_sends[dedup_key] = now
+        
+        # Rate limits - only for sends that will actually go out
+        if queued:
+            await self._acquire_user_slot(recipient)
+        elif not self._check_user_rate_limit(recipient):
+            self._recent_sends.pop(dedup_key, None)
+            return {
+                "success": False,
+                "error": "Rate limit exceeded for this user"
+            }
+        
+        await self._wait_for_rate_limit()
+        
+        result = await self._post_with_retry(endpoint, payload, body, retry_count)
+        
+        # Failed sends must not block an immediate caller retry
+        if not result.get("success"):
+            self._recent_sends.pop(dedup_key, None)
+        
+        return result
+    
+    async def _post_with_retry(
+        self,
+        endpoint: str,
+        payload: Dict,
+        body: bytes,
+        retry_count: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """POST a serialized payload with retry logic and error handling"""
         retry_count = retry_count or self._max_retries
         
+        client = self._get_client()
+        
         for attempt in range(retry_count):
             try:
-                async with httpx.AsyncClient(
-                    timeout=self._client_timeout,
-                    limits=self._limits
-                ) as client:
+                response = await client.post(
+                    f"{self.api_url}{endpoint}",
+                    content=body,
+                    timeout=self._client_timeout
+                )
+                
+                self._apply_rate_limit_headers(response)
+                
+                # Success (202 Accepted)
+                if response.status_code == 202:
+                    self._record_success()
+                    data = _json_loads(response.content)
                     
-                    response = await client.post(
-                        f"{self.api_url}{endpoint}",
-                        headers=self.headers,
-                        json=payload
-                    )
+                    # Track delivery
+                    if data.get("id"):
+                        self._delivery_tracker.track(
+                            data["id"],
+                            payload.get("recipient", {}).get("phone", "unknown"),
+                            DeliveryStatus.SENT
+                        )
                     
-                    # Success (202 Accepted)
-                    if response.status_code == 202:
-                        self._record_success()
-                        data = response.json()
-                        
-                        # Track delivery
-                        if data.get("id"):
-                            self._delivery_tracker.track(
-                                data["id"],
-                                payload.get("recipient", {}).get("phone", "unknown"),
-                                DeliveryStatus.SENT
-                            )
-                        
-                        return {
-                            "success": True,
-                            "data": data,
-                            "message_id": data.get("id"),
-                            "status": "sent"
-                        }
+                    return {
+                        "success": True,
+                        "data": data,
+                        "message_id": data.get("id"),
+                        "status": "sent"
+                    }
+                
+                # Rate limiting (429)
+                elif response.status_code == 429:
+                    retry_after = self._parse_retry_after(response)
+                    logger.warning(f"⚠️ Rate limited by API. Retry after {retry_after}s")
                     
-                    # Rate limiting (429)
-                    elif response.status_code == 429:
-                        retry_after = int(response.headers.get("Retry-After", 5))
-                        logger.warning(f"⚠️ Rate limited by API. Retry after {retry_after}s")
-                        
-                        if attempt < retry_count - 1:
-                            await asyncio.sleep(retry_after)
-                            continue
-                        else:
-                            return {
-                                "success": False,
-                                "error": "Rate limit exceeded",
-                                "retry_after": retry_after
-                            }
+                    # Hold every sender, not just this one
+                    self._bucket.pause(retry_after)
                     
-                    # Bad request (400)
-                    elif response.status_code == 400:
-                        error_data = response.json() if response.text else {}
-                        error_msg = error_data.get("message", "Bad request")
-                        logger.error(f"❌ Bad request: {error_msg}")
-                        
+                    if attempt < retry_count - 1:
+                        await self._bucket.acquire()
+                        continue
+                    else:
                         return {
                             "success": False,
-                            "error": f"Bad request: {error_msg}",
-                            "details": error_data
+                            "error": "Rate limit exceeded",
+                            "retry_after": retry_after
                         }
+                
+                # Bad request (400)
+                elif response.status_code == 400:
+                    try:
+                        error_data = _json_loads(response.content) if response.content else {}
+                    except ValueError:
+                        error_data = {"raw": response.content[:512].decode("utf-8", "replace")}
+                    error_msg = error_data.get("message", "Bad request")
+                    logger.error(f"❌ Bad request: {error_msg}")
+                    
+                    return {
+                        "success": False,
+                        "error": f"Bad request: {error_msg}",
+                        "details": error_data
+                    }
+                
+                # Unauthorized (401)
+                elif response.status_code == 401:
+                    logger.error("❌ Unauthorized - Check API credentials")
+                    await self._record_failure()
+                    
+                    return {
+                        "success": False,
+                        "error": "Unauthorized - Invalid API credentials"
+                    }
+                
+                # Server errors (5xx)
+                elif 500 <= response.status_code < 600:
+                    logger.error(f"❌ Server error: {response.status_code}")
                     
-                    # Unauthorized (401)
-                    elif response.status_code == 401:
-                        logger.error("❌ Unauthorized - Check API credentials")
-                        self._record_failure()
-                        
+                    if attempt < retry_count - 1:
+                        wait_time = self._retry_delay_base ** attempt
+                        await asyncio.sleep(wait_time)
+                        continue
+                    else:
+                        await self._record_failure()
                         return {
                             "success": False,
-                            "error": "Unauthorized - Invalid API credentials"
+                            "error": f"Server error: {response.status_code}"
                         }
+                
+                # Other errors
+                else:
+                    error_msg = f"HTTP {response.status_code}: {response.text}"
+                    logger.error(f"❌ API error: {error_msg}")
                     
-                    # Server errors (5xx)
-                    elif 500 <= response.status_code < 600:
-                        logger.error(f"❌ Server error: {response.status_code}")
-                        
-                        if attempt < retry_count - 1:
-                            wait_time = self._retry_delay_base ** attempt
-                            await asyncio.sleep(wait_time)
-                            continue
-                        else:
-                            self._record_failure()
-                            return {
-                                "success": False,
-                                "error": f"Server error: {response.status_code}"
-                            }
-                    
-                    # Other errors
+                    if attempt < retry_count - 1:
+                        await asyncio.sleep(self._retry_delay_base ** attempt)
+                        continue
                     else:
-                        error_msg = f"HTTP {response.status_code}: {response.text}"
-                        logger.error(f"❌ API error: {error_msg}")
-                        
-                        if attempt < retry_count - 1:
-                            await asyncio.sleep(self._retry_delay_base ** attempt)
-                            continue
-                        else:
-                            self._record_failure()
-                            return {
-                                "success": False,
-                                "error": error_msg
-                            }
-            
+                        await self._record_failure()
+                        return {
+                            "success": False,
+                            "error": error_msg
+                        }
+        
             except httpx.TimeoutException:
                 logger.warning(f"⏱️ Request timeout (attempt {attempt + 1}/{retry_count})")
                 if attempt < retry_count - 1:
                     await asyncio.sleep(self._retry_delay_base ** attempt)
                     continue
                 else:
-                    self._record_failure()
+                    await self._record_failure()
                     return {
                         "success": False,
                         "error": "Request timeout"
@@ -464,7 +895,7 @@ class GallaboxService:
                     await asyncio.sleep(self._retry_delay_base ** attempt)
                     continue
                 else:
-                    self._record_failure()
+                    await self._record_failure()
                     return {
                         "success": False,
                         "error": f"Connection error: {str(e)}"
@@ -476,7 +907,7 @@ class GallaboxService:
                     await asyncio.sleep(self._retry_delay_base ** attempt)
                     continue
                 else:
-                    self._record_failure()
+                    await self._record_failure()
                     return {
                         "success": False,
                         "error": f"Unexpected error: {str(e)}"
@@ -507,15 +938,60 @@ class GallaboxService:
             preview_url: Enable URL preview
             queue: Add to queue instead of sending immediately
         """
-        # Rate limit check
-        if not self._check_user_rate_limit(to):
+        # Queued sends are rate-limited by the queue workers, not here
+        if queue:
+            self._message_queue.start(self._send_queued_text)
+            await self._message_queue.add({
+                "to": to,
+                "message": message,
+                "preview_url": preview_url
+            })
             return {
-                "success": False,
-                "error": "Rate limit exceeded for this user"
+                "success": True,
+                "queued": True,
+                "message": "Message added to queue"
             }
         
-        await self._wait_for_rate_limit()
+        return await self._dispatch_text(to, message, preview_url)
+    
+    async def _send_queued_text(
+        self,
+        to: str,
+        message: str,
+        preview_url: bool = True
+    ) -> Dict[str, Any]:
+        """Queue worker send - waits for a per-user slot instead of failing"""
+        return await self._dispatch_text(to, message, preview_url, queued=True)
+    
+    def _text_body_parts(self, message: str, preview_url: bool = True) -> Tuple[bytes, bytes]:
+        """
+        Pre-serialize everything in a text payload except the recipient phone
         
+        head + _json_dumps(phone) + tail is byte-identical to
+        _json_dumps(payload, sort_keys=True).
+        """
+        head = _json_dumps({"channelId": self.channel_id, "channelType": "whatsapp"}, sort_keys=True)
+        whatsapp = _json_dumps({
+            "type": "text",
+            "text": {
+                "body": message,
+                "previewUrl": preview_url
+            }
+        }, sort_keys=True)
+        return (
+            head[:-1] + b',"recipient":{"name":"User","phone":',
+            b'},"whatsapp":' + whatsapp + b'}'
+        )
+    
+    async def _dispatch_text(
+        self,
+        to: str,
+        message: str,
+        preview_url: bool,
+        body_parts: Optional[Tuple[bytes, bytes]] = None,
+        queued: bool = False
+    ) -> Dict[str, Any]:
+        """Build and send a text payload"""
         payload = {
             "channelId": self.channel_id,
             "channelType": "whatsapp",
@@ -532,22 +1008,22 @@ class GallaboxService:
             }
         }
         
-        # Queue or send immediately
-        if queue:
-            self._message_queue.add({"to": to, "message": message})
-            return {
-                "success": True,
-                "queued": True,
-                "message": "Message added to queue"
-            }
+        # Reuse the pre-serialized constant part when broadcasting
+        body = None
+        if body_parts:
+            head, tail = body_parts
+            body = head + _json_dumps(to) + tail
         
         # Send
-        result = await self._make_api_call("/devapi/messages/whatsapp", payload)
+        result = await self._make_api_call(
+            "/devapi/messages/whatsapp", payload, body=body, queued=queued
+        )
         
         # Track cost
-        if result.get("success"):
+        # Deduplicated sends never reached the API - don't bill or log them
+        if result.get("success") and not result.get("deduped"):
             cost_tracker.track_gallabox_usage("text", to)
-            logger.info(f"✅ Text sent to {to}: {message[:50]}...")
+            self._log_sent("✅ Text sent to %s: %.50s...", to, message)
         
         return result
     
@@ -563,11 +1039,6 @@ class GallaboxService:
     ) -> Dict[str, Any]:
         """Send image message"""
         
-        if not self._check_user_rate_limit(to):
-            return {"success": False, "error": "Rate limit exceeded"}
-        
-        await self._wait_for_rate_limit()
-        
         payload = {
             "channelId": self.channel_id,
             "channelType": "whatsapp",
@@ -583,9 +1054,10 @@ class GallaboxService:
         
         result = await self._make_api_call("/devapi/messages/whatsapp", payload)
         
-        if result.get("success"):
+        # Deduplicated sends never reached the API - don't bill or log them
+        if result.get("success") and not result.get("deduped"):
             cost_tracker.track_gallabox_usage("media", to)
-            logger.info(f"🖼️ Image sent to {to}")
+            self._log_sent("🖼️ Image sent to %s", to)
         
         return result
     
@@ -598,11 +1070,6 @@ class GallaboxService:
     ) -> Dict[str, Any]:
         """Send document message"""
         
-        if not self._check_user_rate_limit(to):
-            return {"success": False, "error": "Rate limit exceeded"}
-        
-        await self._wait_for_rate_limit()
-        
         payload = {
             "channelId": self.channel_id,
             "channelType": "whatsapp",
@@ -619,9 +1086,10 @@ class GallaboxService:
         
         result = await self._make_api_call("/devapi/messages/whatsapp", payload)
         
-        if result.get("success"):
+        # Deduplicated sends never reached the API - don't bill or log them
+        if result.get("success") and not result.get("deduped"):
             cost_tracker.track_gallabox_usage("media", to)
-            logger.info(f"📄 Document sent to {to}: {filename}")
+            self._log_sent("📄 Document sent to %s: %s", to, filename)
         
         return result
     
@@ -633,11 +1101,6 @@ class GallaboxService:
     ) -> Dict[str, Any]:
         """Send video message"""
         
-        if not self._check_user_rate_limit(to):
-            return {"success": False, "error": "Rate limit exceeded"}
-        
-        await self._wait_for_rate_limit()
-        
         payload = {
             "channelId": self.channel_id,
             "channelType": "whatsapp",
@@ -653,9 +1116,10 @@ class GallaboxService:
         
         result = await self._make_api_call("/devapi/messages/whatsapp", payload)
         
-        if result.get("success"):
+        # Deduplicated sends never reached the API - don't bill or log them
+        if result.get("success") and not result.get("deduped"):
             cost_tracker.track_gallabox_usage("media", to)
-            logger.info(f"🎥 Video sent to {to}")
+            self._log_sent("🎥 Video sent to %s", to)
         
         return result
     
@@ -666,11 +1130,6 @@ class GallaboxService:
     ) -> Dict[str, Any]:
         """Send audio message"""
         
-        if not self._check_user_rate_limit(to):
-            return {"success": False, "error": "Rate limit exceeded"}
-        
-        await self._wait_for_rate_limit()
-        
         payload = {
             "channelId": self.channel_id,
             "channelType": "whatsapp",
@@ -685,9 +1144,10 @@ class GallaboxService:
         
         result = await self._make_api_call("/devapi/messages/whatsapp", payload)
         
-        if result.get("success"):
+        # Deduplicated sends never reached the API - don't bill or log them
+        if result.get("success") and not result.get("deduped"):
             cost_tracker.track_gallabox_usage("media", to)
-            logger.info(f"🎵 Audio sent to {to}")
+            self._log_sent("🎵 Audio sent to %s", to)
         
         return result
     
@@ -708,11 +1168,6 @@ class GallaboxService:
         Perfect for property locations!
         """
         
-        if not self._check_user_rate_limit(to):
-            return {"success": False, "error": "Rate limit exceeded"}
-        
-        await self._wait_for_rate_limit()
-        
         payload = {
             "channelId": self.channel_id,
             "channelType": "whatsapp",
@@ -730,9 +1185,10 @@ class GallaboxService:
         
         result = await self._make_api_call("/devapi/messages/whatsapp", payload)
         
-        if result.get("success"):
+        # Deduplicated sends never reached the API - don't bill or log them
+        if result.get("success") and not result.get("deduped"):
             cost_tracker.track_gallabox_usage("text", to)
-            logger.info(f"📍 Location sent to {to}: {name or 'Unnamed'}")
+            self._log_sent("📍 Location sent to %s: %s", to, name or "Unnamed")
         
         return result
     
@@ -745,11 +1201,6 @@ class GallaboxService:
     ) -> Dict[str, Any]:
         """Send contact card"""
         
-        if not self._check_user_rate_limit(to):
-            return {"success": False, "error": "Rate limit exceeded"}
-        
-        await self._wait_for_rate_limit()
-        
         payload = {
             "channelId": self.channel_id,
             "channelType": "whatsapp",
@@ -774,9 +1225,10 @@ class GallaboxService:
         
         result = await self._make_api_call("/devapi/messages/whatsapp", payload)
         
-        if result.get("success"):
+        # Deduplicated sends never reached the API - don't bill or log them
+        if result.get("success") and not result.get("deduped"):
             cost_tracker.track_gallabox_usage("text", to)
-            logger.info(f"👤 Contact sent to {to}: {contact_name}")
+            self._log_sent("👤 Contact sent to %s: %s", to, contact_name)
         
         return result
     
@@ -807,25 +1259,13 @@ class GallaboxService:
             ]
         """
         
-        if not self._check_user_rate_limit(to):
-            return {"success": False, "error": "Rate limit exceeded"}
-        
         if len(buttons) > 3:
             return {"success": False, "error": "Max 3 buttons allowed"}
         
-        await self._wait_for_rate_limit()
-        
-        # Format buttons
-        formatted_buttons = [
-            {
-                "type": "reply",
-                "reply": {
-                    "id": btn["id"],
-                    "title": btn["title"][:20]  # Max 20 chars
-                }
-            }
-            for btn in buttons
-        ]
+        # Format buttons (memoized - campaigns reuse the same button set)
+        formatted_buttons = _format_buttons(
+            tuple((btn["id"], btn["title"]) for btn in buttons)
+        )
         
         interactive_content = {
             "type": "button",
@@ -860,9 +1300,10 @@ class GallaboxService:
         
         result = await self._make_api_call("/devapi/messages/whatsapp", payload)
         
-        if result.get("success"):
+        # Deduplicated sends never reached the API - don't bill or log them
+        if result.get("success") and not result.get("deduped"):
             cost_tracker.track_gallabox_usage("text", to)
-            logger.info(f"🔘 Button message sent to {to}")
+            self._log_sent("🔘 Button message sent to %s", to)
         
         return result
     
@@ -892,11 +1333,6 @@ class GallaboxService:
             }]
         """
         
-        if not self._check_user_rate_limit(to):
-            return {"success": False, "error": "Rate limit exceeded"}
-        
-        await self._wait_for_rate_limit()
-        
         interactive_content = {
             "type": "list",
             "body": {
@@ -931,9 +1367,10 @@ class GallaboxService:
         
         result = await self._make_api_call("/devapi/messages/whatsapp", payload)
         
-        if result.get("success"):
+        # Deduplicated sends never reached the API - don't bill or log them
+        if result.get("success") and not result.get("deduped"):
             cost_tracker.track_gallabox_usage("text", to)
-            logger.info(f"📋 List message sent to {to}")
+            self._log_sent("📋 List message sent to %s", to)
         
         return result
     
@@ -963,11 +1400,6 @@ class GallaboxService:
             button_params: Dynamic values for buttons
         """
         
-        if not self._check_user_rate_limit(to):
-            return {"success": False, "error": "Rate limit exceeded"}
-        
-        await self._wait_for_rate_limit()
-        
         # Build template components
         components = []
         
@@ -1021,9 +1453,10 @@ class GallaboxService:
         
         result = await self._make_api_call("/devapi/messages/whatsapp", payload)
         
-        if result.get("success"):
+        # Deduplicated sends never reached the API - don't bill or log them
+        if result.get("success") and not result.get("deduped"):
             cost_tracker.track_gallabox_usage("text", to)
-            logger.info(f"📋 Template '{template_name}' sent to {to}")
+            self._log_sent("📋 Template '%s' sent to %s", template_name, to)
         
         return result
     
@@ -1051,15 +1484,7 @@ class GallaboxService:
         }
         """
         
-        message = f"""🏠 **{property_data['name']}**
-
-📍 Location: {property_data['location']}
-💰 Price: {property_data['price']}
-🛏️ Bedrooms: {property_data['bedrooms']}
-🚿 Bathrooms: {property_data['bathrooms']}
-📐 Size: {property_data['size_sqft']:,} sq ft
-
-Would you like to schedule a viewing?"""
+        message = _PROPERTY_DETAILS_MESSAGE(property_data)
         
         # Send image with caption
         if property_data.get("image_url"):
@@ -1073,7 +1498,6 @@ Would you like to schedule a viewing?"""
         
         # Send brochure if available
         if result.get("success") and property_data.get("brochure_url"):
-            await asyncio.sleep(1)  # Small delay
             await self.send_document_message(
                 to=to,
                 document_url=property_data["brochure_url"],
@@ -1102,23 +1526,13 @@ Would you like to schedule a viewing?"""
         }
         """
         
-        message = f"""✅ **Viewing Confirmed**
-
-🏠 Property: {viewing_data['property_name']}
-📅 Date: {viewing_data['date']}
-⏰ Time: {viewing_data['time']}
-
-👤 Agent: {viewing_data['agent_name']}
-📞 Contact: {viewing_data['agent_phone']}
-
-We look forward to showing you this property!"""
+        message = _VIEWING_CONFIRMATION_MESSAGE(viewing_data)
         
         # Send confirmation message
         result = await self.send_text_message(to, message)
         
         # Send location if available
         if result.get("success") and viewing_data.get("location"):
-            await asyncio.sleep(1)
             await self.send_location_message(
                 to=to,
                 latitude=viewing_data["location"]["lat"],
@@ -1145,38 +1559,33 @@ We look forward to showing you this property!"""
         }
         """
         
-        message = f"""📄 **Contract Ready for Review**
-
-Dear {contract_data['buyer_name']},
-
-Your purchase contract for **{contract_data['property']}** is ready.
-
-Please review the documents attached and let us know if you have any questions.
-
-{settings.COMPANY_NAME}"""
+        message = _CONTRACT_READY_MESSAGE(ChainMap({"company_name": settings.COMPANY_NAME}, contract_data))
         
         # Send message
         result = await self.send_text_message(to, message)
         
         if result.get("success"):
-            # Send contract
-            await asyncio.sleep(1)
-            await self.send_document_message(
-                to=to,
-                document_url=contract_data["contract_url"],
-                filename="Purchase_Contract.pdf",
-                caption="📝 Purchase Contract"
-            )
+            # Send contract (and terms if available) concurrently
+            tasks = [
+                self.send_document_message(
+                    to=to,
+                    document_url=contract_data["contract_url"],
+                    filename="Purchase_Contract.pdf",
+                    caption="📝 Purchase Contract"
+                )
+            ]
             
-            # Send terms if available
             if contract_data.get("terms_url"):
-                await asyncio.sleep(1)
-                await self.send_document_message(
-                    to=to,
-                    document_url=contract_data["terms_url"],
-                    filename="Terms_and_Conditions.pdf",
-                    caption="📋 Terms & Conditions"
+                tasks.append(
+                    self.send_document_message(
+                        to=to,
+                        document_url=contract_data["terms_url"],
+                        filename="Terms_and_Conditions.pdf",
+                        caption="📋 Terms & Conditions"
+                    )
                 )
+            
+            await asyncio.gather(*tasks)
         
         return result
     
@@ -1195,57 +1604,44 @@ Please review the documents attached and let us know if you have any questions.
         Returns path to downloaded file
         """
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.get(
-                    media_url,
-                    headers=self.headers
-                )
-                
+            async with self._get_client().stream("GET", media_url) as response:
                 if response.status_code != 200:
-                    logger.error(f"Media download failed: HTTP {response.status_code}")
+                    logger.error("Media download failed: HTTP %d", response.status_code)
                     return None
                 
-                # Determine file extension
+                # Determine file extension (headers arrive before the body)
                 content_type = response.headers.get("content-type", "")
                 ext = self._get_extension_from_mime(content_type)
                 
-                # Create temp file if no path provided
+                # Create temp file if no path provided - mkstemp hands back an
+                # open fd, so the file is never reopened by name
+                target: Union[str, int] = save_path
                 if not save_path:
-                    temp_file = tempfile.NamedTemporaryFile(
-                        delete=False,
-                        suffix=ext
-                    )
-                    save_path = temp_file.name
-                    temp_file.close()
-                
-                # Save file
-                with open(save_path, "wb") as f:
-                    f.write(response.content)
+                    target, save_path = tempfile.mkstemp(suffix=ext)
                 
-                logger.info(f"📥 Media downloaded: {save_path} ({len(response.content)} bytes)")
-                return save_path
+                # Stream to disk in chunks
+                total = 0
+                async with aiofiles.open(target, "wb") as f:
+                    async for chunk in response.aiter_bytes(65536):
+                        await f.write(chunk)
+                        total += len(chunk)
+            
+            logger.info("📥 Media downloaded: %s (%d bytes)", save_path, total)
+            return save_path
         
         except Exception as e:
-            logger.error(f"❌ Media download error: {e}")
+            logger.error("❌ Media download error: %s", e)
             return None
     
+    def classify_media(self, path: str) -> Optional[str]:
+        """Get WhatsApp media type (image/document/video/audio) from a file path or URL"""
+        ext = os.path.splitext(urlparse(path).path)[1].lower()
+        return self._ext_to_media_type.get(ext)
+    
     def _get_extension_from_mime(self, mime_type: str) -> str:
         """Get file extension from MIME type"""
-        mime_map = {
-            "image/jpeg": ".jpg",
-            "image/png": ".png",
-            "image/gif": ".gif",
-            "image/webp": ".webp",
-            "application/pdf": ".pdf",
-            "application/msword": ".doc",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
-            "application/vnd.ms-excel": ".xls",
-            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": ".xlsx",
-            "video/mp4": ".mp4",
-            "audio/mpeg": ".mp3",
-            "audio/ogg": ".ogg"
-        }
-        return mime_map.get(mime_type, ".bin")
+        mime_type = mime_type.split(";", 1)[0].strip().lower()
+        return _MIME_MAP.get(mime_type) or mimetypes.guess_extension(mime_type) or ".bin"
     
     # ==========================================
     # BULK MESSAGING
@@ -1254,46 +1650,210 @@ Please review the documents attached and let us know if you have any questions.
     async def send_broadcast(
         self,
         recipients: List[str],
-        message: str,
-        delay_seconds: int = 2
+        message: str
     ) -> Dict[str, Any]:
         """
         Send broadcast message to multiple recipients
         
+        Sends run concurrently (BROADCAST_CONCURRENCY) and are paced by a
+        token bucket at WHATSAPP_MPS messages per second.
+        
         Args:
             recipients: List of phone numbers
             message: Message text
-            delay_seconds: Delay between messages to avoid rate limit
         """
         
+        # Fast-fail the whole batch while the circuit is open
+        if not await self._check_circuit_breaker():
+            return {
+                "total": len(recipients),
+                "sent": 0,
+                "failed": len(recipients),
+                "details": [
+                    {"phone": phone, "success": False, "error": "circuit_open"}
+                    for phone in recipients
+                ],
+                "error": "circuit_open"
+            }
+        
+        details = BroadcastDetails()
+        
+        if settings.GALLABOX_BULK_ENDPOINT:
+            outcomes = await self._broadcast_bulk(recipients, message)
+        else:
+            # Serialize the shared message once; only the phone varies
+            body_parts = self._text_body_parts(message)
+            outcomes = await self._run_broadcast_workers(
+                recipients,
+                lambda phone: self._send_one(phone, message, body_parts)
+            )
+        
+        for phone, result in zip(recipients, outcomes):
+            if isinstance(result, Exception):
+                details.append(phone, False, str(result))
+            else:
+                details.append(phone, result.get("success"), result.get("error"))
+        
+        sent = details.sent
         results = {
             "total": len(recipients),
-            "sent": 0,
-            "failed": 0,
-            "details": []
+            "sent": sent,
+            "failed": len(recipients) - sent,
+            "details": details.to_list()
         }
         
-        for phone in recipients:
-            result = await self.send_text_message(phone, message)
-            
-            if result.get("success"):
-                results["sent"] += 1
+        logger.info("📢 Broadcast complete: %d/%d sent", sent, results["total"])
+        
+        return results
+    
+    async def _run_broadcast_workers(self, items: List[Any], send) -> List[Any]:
+        """
+        Feed items through a bounded queue to BROADCAST_CONCURRENCY workers
+        
+        Returns one outcome per item (result or exception), in input order.
+        """
+        concurrency = settings.BROADCAST_CONCURRENCY
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2 * concurrency)
+        outcomes: List[Any] = [None] * len(items)
+        
+        async def worker():
+            while True:
+                index, item = await queue.get()
+                try:
+                    outcomes[index] = await send(item)
+                except Exception as e:
+                    outcomes[index] = e
+                finally:
+                    queue.task_done()
+        
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            # Producer - blocks while the queue is full (back-pressure)
+            for entry in enumerate(items):
+                await queue.put(entry)
+            await queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        
+        return outcomes
+    
+    async def send_bulk_text(self, batch: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Send many text messages in one bulk API call
+        
+        Args:
+            batch: List of (phone, message) pairs
+        
+        Returns dict with overall success and per-recipient "results" in batch order
+        """
+        payload = {
+            "channelId": self.channel_id,
+            "channelType": "whatsapp",
+            "messages": [
+                {
+                    "recipient": {"name": "User", "phone": phone},
+                    "whatsapp": {
+                        "type": "text",
+                        "text": {"body": message}
+                    }
+                }
+                for phone, message in batch
+            ]
+        }
+        
+        if not await self._check_circuit_breaker():
+            return {
+                "success": False,
+                "error": "Service temporarily unavailable (circuit breaker open)"
+            }
+        
+        # Bypasses _make_api_call: a bulk payload has no single recipient to
+        # dedup on, and _send_bulk_chunk already paces it through the bucket
+        body = _json_dumps(payload, sort_keys=True)
+        result = await self._post_with_retry(settings.GALLABOX_BULK_ENDPOINT, payload, body)
+        if not result.get("success"):
+            return result
+        
+        items = (result.get("data") or {}).get("messages", [])
+        per_recipient = []
+        for index, (phone, _) in enumerate(batch):
+            item = items[index] if index < len(items) else {}
+            if item.get("id"):
+                cost_tracker.track_gallabox_usage("text", phone)
+                per_recipient.append({"success": True, "message_id": item["id"]})
             else:
-                results["failed"] += 1
-            
-            results["details"].append({
-                "phone": phone,
-                "success": result.get("success"),
-                "error": result.get("error")
-            })
-            
-            # Delay to respect rate limits
-            await asyncio.sleep(delay_seconds)
+                per_recipient.append({
+                    "success": False,
+                    "error": item.get("error", "Not accepted by bulk API")
+                })
         
-        logger.info(f"📢 Broadcast complete: {results['sent']}/{results['total']} sent")
+        return {"success": True, "results": per_recipient}
+    
+    async def _broadcast_bulk(self, recipients: List[str], message: str) -> List[Any]:
+        """Broadcast via chunked bulk API calls"""
+        recipient_iter = iter(recipients)
+        chunks = []
+        while True:
+            chunk = list(islice(recipient_iter, settings.BROADCAST_BATCH_SIZE))
+            if not chunk:
+                break
+            chunks.append(chunk)
+        
+        chunk_outcomes = await self._run_broadcast_workers(
+            chunks,
+            lambda chunk: self._send_bulk_chunk(chunk, message)
+        )
+        
+        outcomes: List[Any] = []
+        for chunk, chunk_result in zip(chunks, chunk_outcomes):
+            if isinstance(chunk_result, Exception):
+                chunk_result = [chunk_result] * len(chunk)
+            outcomes.extend(chunk_result)
+        return outcomes
+    
+    async def _send_bulk_chunk(self, chunk: List[str], message: str) -> List[Any]:
+        """Send one bulk chunk; retry individually only what the API rejected"""
+        async with self._broadcast_sem:
+            # Circuit opened mid-broadcast - abort remaining chunks
+            if self._circuit_open:
+                return [{"success": False, "error": "circuit_open"}] * len(chunk)
+            
+            for _ in chunk:
+                await self._bucket.acquire()
+            bulk_result = await self.send_bulk_text([(phone, message) for phone in chunk])
+        
+        if not bulk_result.get("success"):
+            return [bulk_result] * len(chunk)
+        
+        results: List[Any] = bulk_result["results"]
+        rejected = [i for i, result in enumerate(results) if not result.get("success")]
+        if rejected:
+            fallback = await asyncio.gather(
+                *(self._send_one(chunk[i], message) for i in rejected),
+                return_exceptions=True
+            )
+            for i, result in zip(rejected, fallback):
+                results[i] = result
         
         return results
     
+    async def _send_one(
+        self,
+        phone: str,
+        message: str,
+        body_parts: Optional[Tuple[bytes, bytes]] = None
+    ) -> Dict[str, Any]:
+        """Single broadcast send, gated by the semaphore and token bucket"""
+        async with self._broadcast_sem:
+            # Circuit opened mid-broadcast - skip without touching the limiters
+            if self._circuit_open:
+                return {"success": False, "error": "circuit_open"}
+            
+            # Per-user limit and token bucket pacing happen inside the send path
+            return await self._dispatch_text(phone, message, True, body_parts)
+    
     # ==========================================
     # UTILITY & MONITORING
     # ==========================================
@@ -1304,7 +1864,7 @@ Please review the documents attached and let us know if you have any questions.
             "circuit_breaker": {
                 "open": self._circuit_open,
                 "failure_count": self._failure_count,
-                "last_failure": self._last_failure_time.isoformat() if self._last_failure_time else None
+                "last_failure": self._last_failure_iso
             },
             "rate_limits": {
                 "tracked_users": len(self._user_message_times),
@@ -1321,11 +1881,26 @@ Please review the documents attached and let us know if you have any questions.
         self._circuit_open = False
         self._failure_count = 0
         self._last_failure_time = None
+        self._last_failure_iso = None
         logger.info("✅ Circuit breaker manually reset")
     
     async def process_message_queue(self):
         """Process pending messages in queue"""
-        await self._message_queue.process(self.send_text_message)
+        self._message_queue.start(self._send_queued_text)
+        await self._message_queue.join()
+    
+    async def shutdown(self):
+        """Flush queued messages and stop background workers"""
+        await self._message_queue.shutdown()
+        
+        if self._gc_task is not None:
+            self._gc_task.cancel()
+            await asyncio.gather(self._gc_task, return_exceptions=True)
+            self._gc_task = None
+        
+        await self.aclose()
+        
+        logger.info("🛑 Gallabox service shut down")
     
     def get_delivery_status(self, message_id: str) -> Optional[Dict]:
         """Get delivery status for a message"""
@@ -1338,25 +1913,25 @@ Please review the documents attached and let us know if you have any questions.
     
     def get_messages_for_user(self, phone: str) -> List[Dict]:
         """Mock compatibility - not supported in real mode"""
-        logger.warning(f"⚠️ get_messages_for_user() called in REAL mode (not supported)")
+        logger.warning("⚠️ get_messages_for_user() called in REAL mode (not supported)")
         return []
     
     def get_all_messages(self) -> List[Dict]:
         """Mock compatibility - not supported in real mode"""
-        logger.warning(f"⚠️ get_all_messages() called in REAL mode (not supported)")
+        logger.warning("⚠️ get_all_messages() called in REAL mode (not supported)")
         return []
     
     def clear_messages(self):
         """Mock compatibility - no-op in real mode"""
-        logger.warning(f"⚠️ clear_messages() called in REAL mode (no-op)")
+        logger.warning("⚠️ clear_messages() called in REAL mode (no-op)")
     
     def enable_failure_simulation(self, rate: float = 0.1):
         """Mock compatibility - no-op in real mode"""
-        logger.warning(f"⚠️ enable_failure_simulation() called in REAL mode (no-op)")
+        logger.warning("⚠️ enable_failure_simulation() called in REAL mode (no-op)")
     
     def disable_failure_simulation(self):
         """Mock compatibility - no-op in real mode"""
-        logger.warning(f"⚠️ disable_failure_simulation() called in REAL mode (no-op)")
+        logger.warning("⚠️ disable_failure_simulation() called in REAL mode (no-op)")
     
     def get_stats(self) -> Dict:
         """Get service stats"""
@@ -1370,4 +1945,7 @@ Please review the documents attached and let us know if you have any questions.
 # GLOBAL INSTANCE
 # ==========================================
 
+# Import-safe: nothing here touches the event loop. The HTTP client is created
+# on first use, and workers / GC are started and closed by the FastAPI lifespan
+# (start() / shutdown()).
 gallabox_service = GallaboxService()
\ No newline at end of file
@@ -39,10 +39,12 @@ async def _handle_confirmation(...):
     issue_keywords = ["salesforce", "dashboard", "login", "password", 
                      "website", "laptop", "error", "not working"]
     
-    has_new_issue = sum(1 for k in issue_keywords if k in message_text.lower()) >= 2
+    msg_lower = message_text.lower()
     
-    is_confirm = any(w in message_text.lower() for w in ['yes', 'confirm', 'ok'])
-    is_cancel = any(w in message_text.lower() for w in ['no', 'cancel'])
+    has_new_issue = sum(1 for k in issue_keywords if k in msg_lower) >= 2
+    
+    is_confirm = any(w in msg_lower for w in ['yes', 'confirm', 'ok'])
+    is_cancel = any(w in msg_lower for w in ['no', 'cancel'])
     
     # If NEW issue detected
     if has_new_issue and not is_confirm and not is_cancel:
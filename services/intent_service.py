@@ -12,10 +12,16 @@ from services.team_detection import team_detection_service
 from services.project_matcher import project_matcher_service
 from services.jira_service import jira_service
 from services.response_service import response_service
-from typing import Dict, Any, Optional, List
+from services._response_cache import TTLCache
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
 from datetime import datetime, timedelta
+from collections import defaultdict, deque
 import asyncio
+import functools
+import heapq
+import logging
 import re
+import time
 
 from config.settings import settings
 from services import gallabox_service
@@ -31,30 +37,346 @@ from services.vip_detection import vip_detection_service
 
 print(f"🎯 Intent service loaded gallabox: {type(gallabox_service).__name__}")
 
+logger = logging.getLogger(__name__)
+
+
+# Latin + Arabic word tokens (expects lowercased text)
+_TOKEN_RE = re.compile(r"[a-z\u0600-\u06ff]+")
+
+# Same tokenization for pure-ASCII text: every non a-z character becomes a space
+_ASCII_SEPARATORS = str.maketrans({chr(c): " " for c in range(128) if not "a" <= chr(c) <= "z"})
+
+
+# Technical keywords - a match means NOT a real estate query
+_TECHNICAL_KEYWORDS = frozenset({
+    "report", "dashboard", "data", "analytics", "kpi", "metric",
+    "ai report", "campaign report", "marketing report", "analysis",
+    "salesforce", "crm", "system", "ticket", "support", "issue",
+    "error", "bug", "not working", "down", "sync", "login",
+    "password", "access", "permission", "laptop", "keyboard",
+    "website", "api", "database", "server", "deployment"
+})
+
+# Problem indicators for technical queries
+_PROBLEM_KEYWORDS = frozenset({
+    "issue", "problem", "error", "not working", "broken",
+    "down", "failed", "can't", "unable", "wrong",
+    "need help", "need support", "not loading", "stuck"
+})
+
+# Real estate keywords (for actual property queries)
+_REAL_ESTATE_KEYWORDS = frozenset({
+    "villa", "apartment", "penthouse", "property", "bedroom",
+    "buy", "sell", "rent", "lease", "viewing", "purchase"
+})
+
+# Replies to a pending ticket preview
+_CONFIRM_KEYWORDS = frozenset({
+    'yes', 'confirm', 'create', 'ok', 'sure', 'proceed',
+    'correct', 'right', 'good', 'yeah', 'yep', 'y',
+    'نعم', 'موافق', 'تمام'
+})
+_CANCEL_KEYWORDS = frozenset({'cancel', 'no', 'stop', 'لا', 'إلغاء'})
+
+# Technical issue indicators while a ticket is pending confirmation
+_NEW_ISSUE_KEYWORDS = frozenset({
+    "salesforce", "dashboard", "login", "password", "website",
+    "laptop", "keyboard", "error", "not working", "down",
+    "report", "data", "sync", "campaign", "urgent", "api",
+    "crm", "system", "database", "server", "access"
+})
+
+# All detector keyword sets, scanned together by _keyword_hits()
+_KEYWORD_CATEGORIES = {
+    "technical": _TECHNICAL_KEYWORDS,
+    "problem": _PROBLEM_KEYWORDS,
+    "real_estate": _REAL_ESTATE_KEYWORDS,
+    "new_issue": _NEW_ISSUE_KEYWORDS,
+    "confirm": _CONFIRM_KEYWORDS,
+    "cancel": _CANCEL_KEYWORDS,
+}
+
+# Confirm/cancel replies match whole words only ("no" must not hit "know",
+# "y" must not hit every word with a y); everything else matches substrings
+# so plurals and inflections count ("errors", "issues", "logging")
+_WORD_CATEGORIES = frozenset({"confirm", "cancel"})
+
+# Substring keyword -> categories, and whole-word keyword -> categories
+_SUBSTRING_INDEX: Dict[str, tuple] = {}
+_WORD_INDEX: Dict[str, tuple] = {}
+for _category, _keywords in _KEYWORD_CATEGORIES.items():
+    _index = _WORD_INDEX if _category in _WORD_CATEGORIES else _SUBSTRING_INDEX
+    for _keyword in _keywords:
+        _index[_keyword] = _index.get(_keyword, ()) + (_category,)
+del _category, _keywords, _keyword, _index
+
+# One alternation for every substring keyword, longest first inside a lookahead
+# so each position reports its longest match without consuming the text
+_SUBSTRING_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(_SUBSTRING_INDEX, key=len, reverse=True))) + "))"
+)
+
+# Keywords contained in a longer keyword ("data" in "database") - present
+# whenever the longer one is, even though the scan only reports the longer
+_IMPLIED_KEYWORDS: Dict[str, tuple] = {
+    _long: tuple(_short for _short in _SUBSTRING_INDEX if _short != _long and _short in _long)
+    for _long in _SUBSTRING_INDEX
+}
+
+_NO_HITS = frozenset()
+
+
+@functools.lru_cache(maxsize=1024)
+def _keyword_hits(message_lower: str) -> Dict[str, frozenset]:
+    """
+    Find every detector keyword in one pass over the message
+    
+    Returns category -> matched keywords, the same sets `keyword in message`
+    checks would find (confirm/cancel: whole words). Cached, so the detectors
+    can share a scan of the same message; treat the result as read-only.
+    """
+    found = set()
+    for match in _SUBSTRING_RE.finditer(message_lower):
+        keyword = match.group(1)
+        if keyword not in found:
+            found.add(keyword)
+            found.update(_IMPLIED_KEYWORDS[keyword])
+    
+    hits: Dict[str, set] = {}
+    for keyword in found:
+        for category in _SUBSTRING_INDEX[keyword]:
+            hits.setdefault(category, set()).add(keyword)
+    
+    if message_lower.isascii():
+        tokens = set(message_lower.translate(_ASCII_SEPARATORS).split())
+    else:
+        tokens = set(_TOKEN_RE.findall(message_lower))
+    
+    for token in tokens:
+        for category in _WORD_INDEX.get(token, ()):
+            hits.setdefault(category, set()).add(token)
+    
+    return {category: frozenset(keywords) for category, keywords in hits.items()}
+
+# "ACTION + PROPERTY TYPE" patterns, merged into a single alternation
+_PROPERTY_PATTERNS = (
+    r'(?:buy|purchase|looking for|want|need|show me)\s+(?:a|an)?\s*(?:\d+)?\s*(?:bedroom|bed|br)?\s*(?:villa|apartment|property|penthouse)',
+    r'(?:buy|rent|lease)\s+property',
+    r'(?:villa|apartment|property).*(?:for sale|for rent|available)',
+    r'view(?:ing)?\s+(?:a|the)?\s*property',
+    r'(?:2|3|4|5)\s*(?:bed|bedroom|br)\s+(?:villa|apartment)',
+    r'budget.*(?:villa|apartment|property)'
+)
+_PROPERTY_RE = re.compile("|".join(f"(?:{p})" for p in _PROPERTY_PATTERNS), re.IGNORECASE)
+
+# Every _PROPERTY_PATTERNS branch needs one of these - if none occur, skip the regex
+_PROPERTY_ANCHORS = ("villa", "apartment", "property", "penthouse")
+_PROPERTY_ANCHOR_RE = re.compile("|".join(_PROPERTY_ANCHORS))
+
+# Technical problem patterns, merged into a single alternation
+_TECHNICAL_PATTERNS = (
+    r"(?:salesforce|crm|dashboard).*(?:not|issue|error|problem)",
+    r"(?:laptop|keyboard|computer).*(?:not working|broken|issue)",
+    r"(?:login|password|access).*(?:issue|problem|expired|denied)",
+    r"(?:report|data|dashboard).*(?:wrong|incorrect|missing|error)",
+    r"(?:website|api|system).*(?:down|not loading|error|crashed)"
+)
+_TECHNICAL_RE = re.compile("|".join(f"(?:{p})" for p in _TECHNICAL_PATTERNS), re.IGNORECASE)
+
+# Jira ticket key, e.g. "SUP-123"
+_TICKET_KEY_RE = re.compile(r'\b([A-Za-z]{2,}-\d+)\b')
+
+# Leading tokens of _TECHNICAL_PATTERNS - if none occur, the regex cannot match
+_TECHNICAL_ANCHORS = frozenset({
+    "salesforce", "crm", "dashboard", "laptop", "keyboard", "computer",
+    "login", "password", "access", "report", "data", "website", "api", "system"
+})
+_TECHNICAL_ANCHOR_RE = re.compile("|".join(sorted(_TECHNICAL_ANCHORS)))
+
+# Keyword checks only look at the start of a message (users paste long logs)
+_SCAN_LIMIT = 512
+
+# Only short messages (confirmations, quick replies) are worth caching
+_LANG_CACHE_MAX_LEN = 200
+
+# Short ASCII replies the detector always classifies as English
+_ENGLISH_QUICK_REPLIES = frozenset(
+    k for k in _CONFIRM_KEYWORDS | _CANCEL_KEYWORDS if k.isascii()
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_detect(message: str) -> tuple:
+    """Memoized multilingual_service.detect_language for short messages"""
+    return multilingual_service.detect_language(message)
+
+
+def _detect_language(message: str) -> tuple:
+    """Detect language, reusing results for repeated short messages"""
+    # "yes" / "ok" / "no" - skip the detector entirely (same result it would give)
+    if len(message) < 10 and message.isascii() and message.strip().lower() in _ENGLISH_QUICK_REPLIES:
+        return Language.ENGLISH, 0.8
+    
+    if len(message) > _LANG_CACHE_MAX_LEN:
+        return multilingual_service.detect_language(message)
+    return _cached_detect(message)
+
+
+# Localized reply templates per language; English is the fallback
+_EN_TEMPLATES: Dict[str, str] = {
+    "new_issue_ack": "Got it! Let me help with this new issue.",
+    "ticket_cancelled": "Ticket creation cancelled. How else can I help you?",
+    "no_tickets": "I couldn't find any tickets associated with your number.",
+    "ticket_key_prompt_update": "Please provide the ticket number you'd like to update (e.g., SUP-123).",
+    "update_success": "✅ Ticket *{key}* has been updated with your comment.",
+    "ticket_key_prompt_close": "Which ticket would you like to close? Please provide the ticket number.",
+    "close_success": "✅ Ticket *{key}* has been closed.\n\nThank you for confirming!",
+    "greeting": """Hello {name}! 👋
+
+I'm your Jira Support Assistant. I can help you with:
+• Create support tickets
+• Check ticket status  
+• Update existing tickets
+
+What can I help you with today?"""
+}
+
+_AR_TEMPLATES: Dict[str, str] = {
+    "new_issue_ack": "حسناً! دعني أساعدك في هذه المشكلة الجديدة.",
+    "ticket_cancelled": "تم إلغاء إنشاء التذكرة. كيف يمكنني مساعدتك؟",
+    "no_tickets": "لم أجد أي تذاكر مرتبطة برقمك.",
+    "ticket_key_prompt_update": "يرجى تقديم رقم التذكرة التي ترغب في تحديثها (مثال: SUP-123).",
+    "update_success": "✅ تم تحديث التذكرة *{key}* بتعليقك.",
+    "ticket_key_prompt_close": "أي تذكرة ترغب في إغلاقها؟ يرجى تقديم رقم التذكرة.",
+    "close_success": "✅ تم إغلاق التذكرة *{key}*.\n\nشكراً لك على التأكيد!",
+    "greeting": """مرحباً {name}! 👋
+
+أنا مساعد دعم Jira. يمكنني مساعدتك في:
+• إنشاء تذاكر الدعم
+• التحقق من حالة التذكرة
+• تحديث التذاكر الموجودة
+
+كيف يمكنني مساعدتك اليوم؟"""
+}
+
+_LANG_TEMPLATES: Dict[Language, Dict[str, str]] = {
+    Language.ENGLISH: _EN_TEMPLATES,
+    Language.ARABIC: _AR_TEMPLATES,
+}
+
+
+# Jira failure replies - errors can be large JSON payloads, so cap them at 200 chars
+_UPDATE_FAIL_TMPL = "❌ Failed to update ticket: {err:.200}"
+_CLOSE_FAIL_TMPL = "❌ Failed to close ticket: {err:.200}"
+_STATUS_FAIL_TMPL = "❌ {err:.200}"
+
+
+def _jira_error(result: Dict[str, Any]) -> str:
+    return str(result.get('error') or 'unknown')
+
+
+# Jira comment wrapper for messages added via WhatsApp
+_COMMENT_PREFIX = "*Comment from user via WhatsApp:*\n"
+
+
+@functools.lru_cache(maxsize=1024)
+def _comment_suffix(user_name: str, user_phone: str) -> str:
+    """Per-sender attribution line appended to Jira comments"""
+    return f"\n\n_Added by: {user_name} ({user_phone})_"
+
+
+def _templates(language: Language) -> Dict[str, str]:
+    """Reply templates for a language (English for anything without its own table)"""
+    return _LANG_TEMPLATES.get(language, _EN_TEMPLATES)
+
+
+@functools.lru_cache(maxsize=4096)
+def _render_greeting(user_name: str, language: Language) -> str:
+    """Rendered greeting for a sender (repeat "hi" messages reuse the string)"""
+    return _templates(language)["greeting"].format(name=user_name)
+
+
+def _decode(snippet: bytes) -> str:
+    """Text of a stored context snippet (kept as UTF-8 bytes)"""
+    return snippet.decode("utf-8")
+
+
+class UserContextRing:
+    """
+    Last N legacy context entries for one user, stored column-wise
+    
+    One deque per field instead of a dict per entry; iterating yields the
+    familiar {"message", "intent", "confidence", "timestamp"} dicts.
+    Messages are kept as UTF-8 bytes and decoded on the way out.
+    """
+    
+    __slots__ = ("messages", "intents", "confidences", "timestamps")
+    
+    def __init__(self, maxlen: int = 10):
+        self.messages: deque = deque(maxlen=maxlen)
+        self.intents: deque = deque(maxlen=maxlen)
+        self.confidences: deque = deque(maxlen=maxlen)
+        self.timestamps: deque = deque(maxlen=maxlen)
+    
+    def append(self, message: bytes, intent: str, confidence: float, timestamp: float):
+        self.messages.append(message)
+        self.intents.append(intent)
+        self.confidences.append(confidence)
+        self.timestamps.append(timestamp)
+    
+    def __len__(self) -> int:
+        return len(self.messages)
+    
+    def __iter__(self):
+        for message, intent, confidence, timestamp in zip(
+            self.messages, self.intents, self.confidences, self.timestamps
+        ):
+            yield {
+                "message": _decode(message),
+                "intent": intent,
+                "confidence": confidence,
+                "timestamp": timestamp
+            }
+
 
 class IntentService:
     def __init__(self):
         # Legacy context storage
-        self._conversation_context: Dict[str, List] = {}
+        self._conversation_context: Dict[str, UserContextRing] = defaultdict(UserContextRing)
         self._context_max_age_minutes = 30
         
+        # Context TTL: last update per phone + min-heap of (expiry, phone)
+        self._context_last_seen: Dict[str, float] = {}
+        self._context_expiry: List[Tuple[float, str]] = []
+        
         # ==========================================
         # FIXED: More specific technical keywords
         # ==========================================
-        self._technical_keywords = {
-            "report", "dashboard", "data", "analytics", "kpi", "metric",
-            "ai report", "campaign report", "marketing report", "analysis",
-            "salesforce", "crm", "system", "ticket", "support", "issue",
-            "error", "bug", "not working", "down", "sync", "login",
-            "password", "access", "permission", "laptop", "keyboard",
-            "website", "api", "database", "server", "deployment"
-        }
+        self._technical_keywords = _TECHNICAL_KEYWORDS
         
         # Real estate keywords (for actual property queries)
-        self._real_estate_keywords = {
-            "villa", "apartment", "penthouse", "property", "bedroom",
-            "buy", "sell", "rent", "lease", "viewing", "purchase"
+        self._real_estate_keywords = _REAL_ESTATE_KEYWORDS
+        
+        # Jira project key -> name, refreshed every _project_cache_ttl seconds
+        self._project_cache: Optional[Tuple[float, Dict[str, str]]] = None
+        self._project_cache_ttl = 600
+        
+        # Sales redirect replies keyed by (slot, message language, user_name)
+        self._redirect_cache = TTLCache(maxsize=1024, ttl=300)
+        
+        # Intent -> handler dispatch table (bound once, not per message)
+        self._intent_handlers: Dict[IntentType, Callable[..., Awaitable[Dict[str, Any]]]] = {
+            IntentType.CREATE_TICKET: self._handle_create_ticket,
+            IntentType.CHECK_STATUS: self._handle_check_status,
+            IntentType.UPDATE_TICKET: self._handle_update_ticket,
+            IntentType.CLOSE_TICKET: self._handle_close_ticket,
+            IntentType.PROPERTY_INQUIRY: self._handle_property_inquiry,
+            IntentType.SCHEDULE_VIEWING: self._handle_schedule_viewing,
+            IntentType.GENERAL_INQUIRY: self._handle_general_inquiry
         }
+        
+        # Fire-and-forget bookkeeping tasks (strong refs until they finish)
+        self._background_tasks: set = set()
     
     async def process_message(
         self, 
@@ -66,21 +388,17 @@ class IntentService:
         🔥 FIXED: Main message processing
         """
         
-        print(f"\n{'='*70}")
-        print(f"🔄 PROCESSING MESSAGE FROM {user_name}")
-        print(f"{'='*70}")
-        print(f"📱 Phone: {user_phone}")
-        print(f"💬 Message: {message_text[:100]}...")
+        logger.debug("🔄 PROCESSING MESSAGE FROM %s | 📱 %s | 💬 %.100s", user_name, user_phone, message_text)
         
         # ==========================================
         # 1. DETECT LANGUAGE
         # ==========================================
-        detected_language, lang_confidence = multilingual_service.detect_language(message_text)
-        print(f"🌍 Language: {detected_language.value} (confidence: {lang_confidence:.2f})")
+        detected_language, lang_confidence = _detect_language(message_text)
+        logger.debug("🌍 Language: %s (confidence: %.2f)", detected_language.value, lang_confidence)
         
         # Translate to English if Arabic
         original_message = message_text
-        if detected_language == Language.ARABIC:
+        if detected_language is Language.ARABIC:
             translation_result = await multilingual_service.translate(
                 message_text,
                 target_language=Language.ENGLISH,
@@ -88,13 +406,28 @@ class IntentService:
                 context="customer inquiry"
             )
             message_text = translation_result.translated_text
-            print(f"🔄 Translated to English: {message_text[:80]}...")
+            logger.debug("🔄 Translated to English: %.80s...", message_text)
+        
+        # Lowercased once, shared by the keyword detectors below
+        message_lower = message_text.lower()
+        
+        # Memoized lookups scoped to this message
+        request_cache: Dict = {}
         
         # ==========================================
-        # 2. GET/CREATE SESSION
+        # 2-4. SESSION, SENTIMENT, VIP DETECTION
         # ==========================================
+        # Independent in-memory analyses, run back to back; logging follows
         session = conversation_memory.get_or_create_session(user_phone, user_name)
-        print(f"💾 Session: {session.conversation_id} | State: {session.state.value}")
+        sentiment_result = sentiment_analyzer.analyze_sentiment(message_text, user_phone)
+        vip_result = vip_detection_service.detect_vip(message_text, user_phone, user_name)
+        is_vip = vip_result['is_vip']
+        
+        logger.debug("💾 Session: %s | State: %s", session.conversation_id, session.state.value)
+        logger.debug("😊 Sentiment: %s | Urgency: %s/10", sentiment_result['sentiment'], sentiment_result['urgency'])
+        
+        if sentiment_result.get('escalate'):
+            logger.info("🚨 ESCALATION TRIGGERED: %s", sentiment_result.get('reason'))
         
         conversation_memory.update_preference(
             user_phone,
@@ -106,26 +439,11 @@ class IntentService:
             user_phone,
             MessageRole.USER,
             original_message,
-            metadata={"translated": message_text if detected_language == Language.ARABIC else None}
+            metadata={"translated": message_text if detected_language is Language.ARABIC else None}
         )
         
-        # ==========================================
-        # 3. SENTIMENT ANALYSIS
-        # ==========================================
-        sentiment_result = sentiment_analyzer.analyze_sentiment(message_text, user_phone)
-        print(f"😊 Sentiment: {sentiment_result['sentiment']} | Urgency: {sentiment_result['urgency']}/10")
-        
-        if sentiment_result.get('escalate'):
-            print(f"🚨 ESCALATION TRIGGERED: {sentiment_result.get('reason')}")
-        
-        # ==========================================
-        # 4. VIP DETECTION
-        # ==========================================
-        vip_result = vip_detection_service.detect_vip(message_text, user_phone, user_name)
-        is_vip = vip_result['is_vip']
-        
         if is_vip:
-            print(f"👑 VIP DETECTED: Tier {vip_result['vip_tier']} | Confidence: {vip_result['confidence']:.2f}")
+            logger.info("👑 VIP DETECTED: Tier %s | Confidence: %.2f", vip_result['vip_tier'], vip_result['confidence'])
             conversation_memory.set_vip_status(user_phone, True, vip_result['vip_tier'])
         
         response_service.update_user_stats(
@@ -140,16 +458,17 @@ class IntentService:
         pending = response_service.get_pending_ticket(user_phone)
         
         if pending and pending.awaiting_confirmation:
-            print("📋 User has pending ticket awaiting confirmation")
+            logger.debug("📋 User has pending ticket awaiting confirmation")
             result = await self._handle_confirmation(
-                user_phone, user_name, message_text, pending, detected_language
+                user_phone, user_name, message_text, pending, detected_language,
+                message_lower=message_lower
             )
             
             # ==========================================
             # FIXED: Check if new issue detected
             # ==========================================
             if result.get("action") == "new_issue_detected":
-                print("🔄 New issue detected, reprocessing...")
+                logger.debug("🔄 New issue detected, reprocessing...")
                 # Don't return, continue processing as new message
                 pass
             else:
@@ -158,28 +477,22 @@ class IntentService:
         # ==========================================
         # 6. CHECK IF TECHNICAL SUPPORT QUERY
         # ==========================================
-        if self._is_technical_query(message_text):
-            print("🎫 TECHNICAL SUPPORT QUERY DETECTED")
+        if self._is_technical_query(message_text, message_lower):
+            logger.debug("🎫 TECHNICAL SUPPORT QUERY DETECTED")
             
             # Process as ticket creation
             return await self._handle_create_ticket(
-                user_phone, user_name, message_text, None, detected_language
+                user_phone, user_name, message_text, None, detected_language,
+                session=session
             )
         
         # ==========================================
         # 7. CHECK IF REAL ESTATE QUERY
         # ==========================================
-        if self._is_real_estate_query(message_text):
-            print("🏠 REAL ESTATE QUERY DETECTED - Redirecting")
+        if self._is_real_estate_query(message_text, message_lower):
+            logger.debug("🏠 REAL ESTATE QUERY DETECTED - Redirecting")
             
-            response = await multilingual_service.get_smart_response(
-                "property_redirect",
-                original_message,
-                user_phone,
-                name=user_name,
-                email=settings.WHATSAPP_BUSINESS_EMAIL,
-                website=settings.WHATSAPP_BUSINESS_WEBSITE
-            )
+            response = await self._sales_redirect_message(user_phone, user_name, original_message)
             
             await gallabox_service.send_text_message(user_phone, response)
             
@@ -199,7 +512,7 @@ class IntentService:
         # ==========================================
         # 8. CLASSIFY INTENT WITH AI
         # ==========================================
-        conversation_history = conversation_memory.get_recent_context(user_phone, messages=5)
+        conversation_history = self._get_conversation_history(user_phone, request_cache)
         
         intent_result = await openai_service.classify_intent(
             message=message_text,
@@ -208,7 +521,7 @@ class IntentService:
             conversation_history=conversation_history
         )
         
-        print(f"🎯 Intent: {intent_result.intent.value} (confidence: {intent_result.confidence:.2f})")
+        logger.debug("🎯 Intent: %s (confidence: %.2f)", intent_result.intent.value, intent_result.confidence)
         
         conversation_memory.add_topic(user_phone, intent_result.intent.value)
         
@@ -230,8 +543,7 @@ class IntentService:
             intent_result.confidence
         )
         
-        print(f"✅ Message processing complete")
-        print(f"{'='*70}\n")
+        logger.debug("✅ Message processing complete")
         
         return response
     
@@ -239,7 +551,7 @@ class IntentService:
     # FIXED: TECHNICAL QUERY DETECTION
     # ==========================================
     
-    def _is_technical_query(self, message: str) -> bool:
+    def _is_technical_query(self, message: str, message_lower: Optional[str] = None) -> bool:
         """
         🔥 FIXED: Detect if this is a technical support query
         
@@ -248,43 +560,28 @@ class IntentService:
         - Describes a problem/issue
         - NOT a property inquiry
         """
-        message_lower = message.lower()
+        if message_lower is None:
+            message_lower = message.lower()
+        hits = _keyword_hits(message_lower)
         
         # Count technical keywords
-        technical_count = sum(
-            1 for keyword in self._technical_keywords
-            if keyword in message_lower
-        )
+        technical_count = len(hits.get("technical", _NO_HITS))
         
         # Problem indicators
-        problem_indicators = [
-            "issue", "problem", "error", "not working", "broken",
-            "down", "failed", "can't", "unable", "wrong",
-            "need help", "need support", "not loading", "stuck"
-        ]
-        
-        has_problem = any(indicator in message_lower for indicator in problem_indicators)
-        
-        # Technical patterns
-        technical_patterns = [
-            r"(?:salesforce|crm|dashboard).*(?:not|issue|error|problem)",
-            r"(?:laptop|keyboard|computer).*(?:not working|broken|issue)",
-            r"(?:login|password|access).*(?:issue|problem|expired|denied)",
-            r"(?:report|data|dashboard).*(?:wrong|incorrect|missing|error)",
-            r"(?:website|api|system).*(?:down|not loading|error|crashed)"
-        ]
-        
-        matches_pattern = any(re.search(p, message_lower) for p in technical_patterns)
+        has_problem = "problem" in hits
         
         # Decision logic
         is_technical = (
             technical_count >= 2 or  # Multiple technical keywords
-            (technical_count >= 1 and has_problem) or  # Technical keyword + problem
-            matches_pattern  # Matches technical problem pattern
+            (technical_count >= 1 and has_problem)  # Technical keyword + problem
         )
         
+        # Technical problem pattern - only worth running when an anchor token is present
+        if not is_technical and _TECHNICAL_ANCHOR_RE.search(message_lower):
+            is_technical = _TECHNICAL_RE.search(message_lower) is not None
+        
         if is_technical:
-            print(f"   ✅ Technical query detected (keywords: {technical_count}, problem: {has_problem})")
+            logger.debug("   ✅ Technical query detected (keywords: %d, problem: %s)", technical_count, has_problem)
         
         return is_technical
     
@@ -292,7 +589,7 @@ class IntentService:
     # FIXED: REAL ESTATE QUERY DETECTION
     # ==========================================
     
-    def _is_real_estate_query(self, message: str) -> bool:
+    def _is_real_estate_query(self, message: str, message_lower: Optional[str] = None) -> bool:
         """
         🔥 FIXED: Real estate query detection
         
@@ -304,51 +601,37 @@ class IntentService:
         - "I need AI report for campaign" (even if campaign has location name)
         - "Dashboard for four seasons" (technical, not property)
         """
-        message_lower = message.lower()
+        if message_lower is None:
+            message_lower = message[:_SCAN_LIMIT].lower()
+        else:
+            message_lower = message_lower[:_SCAN_LIMIT]
         
         # ==========================================
         # EXCLUDE if technical keywords present
         # ==========================================
-        if any(keyword in message_lower for keyword in self._technical_keywords):
-            print(f"   ❌ Has technical keywords - NOT real estate query")
+        hits = _keyword_hits(message_lower)
+        if "technical" in hits:
+            logger.debug("   ❌ Has technical keywords - NOT real estate query")
             return False
         
         # ==========================================
         # ONLY include if EXPLICIT property intent
         # ==========================================
         
-        # Property transaction keywords
-        property_actions = ["buy", "purchase", "rent", "lease", "sell", "looking for", "want", "need", "show me"]
-        property_types = ["villa", "apartment", "penthouse", "townhouse", "property", "flat"]
-        
-        # Check for "ACTION + PROPERTY TYPE" pattern
-        property_patterns = [
-            r'(?:buy|purchase|looking for|want|need|show me)\s+(?:a|an)?\s*(?:\d+)?\s*(?:bedroom|bed|br)?\s*(?:villa|apartment|property|penthouse)',
-            r'(?:buy|rent|lease)\s+property',
-            r'(?:villa|apartment|property).*(?:for sale|for rent|available)',
-            r'view(?:ing)?\s+(?:a|the)?\s*property',
-            r'(?:2|3|4|5)\s*(?:bed|bedroom|br)\s+(?:villa|apartment)',
-            r'budget.*(?:villa|apartment|property)'
-        ]
-        
-        matches_property_pattern = any(re.search(p, message_lower) for p in property_patterns)
-        
         # Count pure property keywords (excluding technical context)
-        property_keyword_count = sum(
-            1 for keyword in self._real_estate_keywords
-            if keyword in message_lower
-        )
+        property_keyword_count = len(hits.get("real_estate", _NO_HITS))
         
         # Decision
-        is_property_query = (
-            matches_property_pattern or  # Clear property transaction pattern
-            property_keyword_count >= 3   # Multiple property-specific keywords
-        )
+        is_property_query = property_keyword_count >= 3  # Multiple property-specific keywords
+        
+        # Check for "ACTION + PROPERTY TYPE" pattern (cheap substring prescreen first)
+        if not is_property_query and _PROPERTY_ANCHOR_RE.search(message_lower):
+            is_property_query = _PROPERTY_RE.search(message_lower) is not None
         
         if is_property_query:
-            print(f"   🏠 Real estate query detected")
+            logger.debug("   🏠 Real estate query detected")
         else:
-            print(f"   ❌ NOT a real estate query")
+            logger.debug("   ❌ NOT a real estate query")
         
         return is_property_query
     
@@ -364,39 +647,85 @@ class IntentService:
         intent_result: IntentClassification,
         detected_language: Language
     ) -> Dict[str, Any]:
-        """Route message to appropriate handler"""
+        """Route message to appropriate handler (general inquiry by default)"""
+        handler = self._intent_handlers.get(intent_result.intent, self._handle_general_inquiry)
         
-        handlers = {
-            IntentType.CREATE_TICKET: self._handle_create_ticket,
-            IntentType.CHECK_STATUS: self._handle_check_status,
-            IntentType.UPDATE_TICKET: self._handle_update_ticket,
-            IntentType.CLOSE_TICKET: self._handle_close_ticket,
-            IntentType.PROPERTY_INQUIRY: self._handle_property_inquiry,
-            IntentType.SCHEDULE_VIEWING: self._handle_schedule_viewing,
-            IntentType.GENERAL_INQUIRY: self._handle_general_inquiry
-        }
-        
-        handler = handlers.get(intent_result.intent)
-        
-        if handler:
-            return await handler(
-                user_phone, user_name, message_text, intent_result, detected_language
+        return await handler(
+            user_phone, user_name, message_text, intent_result, detected_language
+        )
+    
+    def _run_in_background(self, coro) -> asyncio.Task:
+        """Schedule non user-facing work without awaiting it"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
+    async def _record_agent_reply(
+        self,
+        user_phone: str,
+        message: str,
+        intent: str,
+        stats_action: Optional[str] = None
+    ):
+        """Post-send bookkeeping: conversation history and user stats"""
+        try:
+            conversation_memory.add_message(
+                user_phone,
+                MessageRole.AGENT,
+                message,
+                intent=intent
             )
-        else:
-            return await self._handle_general_inquiry(
-                user_phone, user_name, message_text, intent_result, detected_language
+            
+            if stats_action:
+                response_service.update_user_stats(user_phone, action=stats_action)
+        except Exception:
+            logger.exception("Failed to record reply for %s", user_phone)
+    
+    async def _finish_jira_call(self, call, user_phone: str, failure_template: str):
+        """Await a Jira call that was acknowledged optimistically; report failures"""
+        try:
+            result = await call
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        
+        if not result.get('success'):
+            await gallabox_service.send_text_message(
+                user_phone,
+                failure_template.format(err=_jira_error(result))
             )
     
+    async def _get_project_name(self, project_key: str) -> str:
+        """Resolve a Jira project key to its name (cached project list)"""
+        cache = self._project_cache
+        if cache is None or time.monotonic() - cache[0] > self._project_cache_ttl:
+            try:
+                projects = await jira_service.get_all_projects()
+            except Exception:
+                projects = []
+            
+            # Don't cache a failed/empty fetch
+            if projects:
+                cache = (time.monotonic(), {p.key: p.name for p in projects})
+                self._project_cache = cache
+        
+        if cache is None:
+            return project_key
+        return cache[1].get(project_key, project_key)
+    
     async def _handle_create_ticket(
         self,
         user_phone: str,
         user_name: str,
         message_text: str,
         intent_result: Optional[IntentClassification],
-        detected_language: Language
+        detected_language: Language,
+        session=None
     ) -> Dict[str, Any]:
         """
         🔥 FIXED: Create support ticket with preview
+        
+        `session` can be passed in by callers that already fetched it.
         """
         
         print("🎫 Creating support ticket...")
@@ -410,21 +739,15 @@ class IntentService:
         # Always use default project
         project_key = settings.JIRA_PROJECT_KEY
         
-        # Get project name
-        try:
-            projects = await jira_service.get_all_projects()
-            project = next((p for p in projects if p.key == project_key), None)
-            project_name = project.name if project else project_key
-        except:
-            project_name = project_key
-        
-        # Generate summary and description
-        summary = await openai_service.generate_ticket_summary(
-            message_text, user_name, team_name, user_phone
-        )
-        
-        description = await openai_service.generate_ticket_description(
-            message_text, user_name, user_phone
+        # Get project name and generate summary/description concurrently
+        project_name, summary, description = await asyncio.gather(
+            self._get_project_name(project_key),
+            openai_service.generate_ticket_summary(
+                message_text, user_name, team_name, user_phone
+            ),
+            openai_service.generate_ticket_description(
+                message_text, user_name, user_phone
+            )
         )
         
         # Determine priority
@@ -433,7 +756,8 @@ class IntentService:
             priority = intent_result.priority
         
         # Check sentiment for priority escalation
-        session = conversation_memory.get_or_create_session(user_phone, user_name)
+        if session is None:
+            session = conversation_memory.get_or_create_session(user_phone, user_name)
         if session.is_vip:
             priority = Priority.HIGH
             print("⚡ Priority escalated to HIGH (VIP)")
@@ -466,11 +790,8 @@ class IntentService:
         
         await gallabox_service.send_text_message(user_phone, confirmation_message)
         
-        conversation_memory.add_message(
-            user_phone,
-            MessageRole.AGENT,
-            confirmation_message,
-            intent="ticket_preview"
+        self._run_in_background(
+            self._record_agent_reply(user_phone, confirmation_message, "ticket_preview")
         )
         
         return {
@@ -495,44 +816,34 @@ class IntentService:
         user_name: str,
         message_text: str,
         pending: PendingTicket,
-        detected_language: Language
+        detected_language: Language,
+        message_lower: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         🔥 FIXED: Handle user confirmation or detect new issue
         """
         
-        message_lower = message_text.lower().strip()
+        if message_lower is None:
+            message_lower = message_text[:_SCAN_LIMIT].lower()
+        message_lower = message_lower[:_SCAN_LIMIT].strip()
         
         # ==========================================
         # DETECT IF THIS IS A NEW ISSUE
         # ==========================================
         
-        # Technical issue indicators
-        new_issue_keywords = [
-            "salesforce", "dashboard", "login", "password", "website",
-            "laptop", "keyboard", "error", "not working", "down",
-            "report", "data", "sync", "campaign", "urgent", "api",
-            "crm", "system", "database", "server", "access"
-        ]
-        
-        # Count issue keywords in message
-        issue_keyword_count = sum(
-            1 for keyword in new_issue_keywords
-            if keyword in message_lower
-        )
-        
-        # Confirmation keywords
-        confirm_keywords = [
-            'yes', 'confirm', 'create', 'ok', 'sure', 'proceed', 
-            'correct', 'right', 'good', 'yeah', 'yep', 'y',
-            'نعم', 'موافق', 'تمام'
-        ]
-        
-        # Cancel keywords
-        cancel_keywords = ['cancel', 'no', 'stop', 'لا', 'إلغاء']
-        
-        is_confirmation = any(word in message_lower for word in confirm_keywords)
-        is_cancellation = any(word in message_lower for word in cancel_keywords)
+        if message_lower in _CONFIRM_KEYWORDS or message_lower in _CANCEL_KEYWORDS:
+            # Single-word reply ("yes", "no", "نعم") - no scan needed
+            issue_keyword_count = 0
+            is_confirmation = message_lower in _CONFIRM_KEYWORDS
+            is_cancellation = not is_confirmation
+        else:
+            # Count distinct issue keywords in message
+            hits = _keyword_hits(message_lower)
+            issue_keyword_count = len(hits.get("new_issue", _NO_HITS))
+            
+            # Confirmation / cancel keywords (whole words, so "know" is not "no")
+            is_confirmation = "confirm" in hits
+            is_cancellation = "cancel" in hits
         
         # ==========================================
         # IF NEW ISSUE DETECTED (NOT Yes/No/Cancel)
@@ -546,9 +857,7 @@ class IntentService:
             response_service.clear_pending_ticket(user_phone)
             
             # Send brief acknowledgment
-            ack_msg = "Got it! Let me help with this new issue."
-            if detected_language == Language.ARABIC:
-                ack_msg = "حسناً! دعني أساعدك في هذه المشكلة الجديدة."
+            ack_msg = _templates(detected_language)["new_issue_ack"]
             
             await gallabox_service.send_text_message(user_phone, ack_msg)
             
@@ -586,16 +895,16 @@ class IntentService:
                 
                 await gallabox_service.send_text_message(user_phone, success_msg)
                 
-                conversation_memory.add_message(
-                    user_phone,
-                    MessageRole.AGENT,
-                    success_msg,
-                    intent="ticket_created"
-                )
-                
-                response_service.update_user_stats(user_phone, action="ticket_created")
+                # Clear right away so a repeated "yes" can't create a second ticket
                 response_service.clear_pending_ticket(user_phone)
                 
+                self._run_in_background(
+                    self._record_agent_reply(
+                        user_phone, success_msg, "ticket_created",
+                        stats_action="ticket_created"
+                    )
+                )
+                
                 return {
                     "intent": "create_ticket",
                     "action": "created",
@@ -619,10 +928,7 @@ class IntentService:
         # ==========================================
         elif is_cancellation:
             response_service.clear_pending_ticket(user_phone)
-            cancel_msg = "Ticket creation cancelled. How else can I help you?"
-            
-            if detected_language == Language.ARABIC:
-                cancel_msg = "تم إلغاء إنشاء التذكرة. كيف يمكنني مساعدتك؟"
+            cancel_msg = _templates(detected_language)["ticket_cancelled"]
             
             await gallabox_service.send_text_message(user_phone, cancel_msg)
             return {
@@ -676,7 +982,7 @@ class IntentService:
         ticket_key = intent_result.ticket_key
         
         if not ticket_key:
-            match = re.search(r'\b([A-Z]{2,}-\d+)\b', message_text, re.IGNORECASE)
+            match = _TICKET_KEY_RE.search(message_text)
             if match:
                 ticket_key = match.group(1).upper()
         
@@ -691,7 +997,7 @@ class IntentService:
                 
                 message += "Reply with the ticket number (e.g., SUP-123) to see details."
                 
-                if detected_language == Language.ARABIC:
+                if detected_language is Language.ARABIC:
                     translation = await multilingual_service.translate(
                         message,
                         Language.ARABIC,
@@ -701,9 +1007,7 @@ class IntentService:
                 
                 await gallabox_service.send_text_message(user_phone, message)
             else:
-                no_tickets_msg = "I couldn't find any tickets associated with your number."
-                if detected_language == Language.ARABIC:
-                    no_tickets_msg = "لم أجد أي تذاكر مرتبطة برقمك."
+                no_tickets_msg = _templates(detected_language)["no_tickets"]
                 
                 await gallabox_service.send_text_message(user_phone, no_tickets_msg)
             
@@ -736,7 +1040,7 @@ class IntentService:
                 "response_sent": True
             }
         else:
-            error_msg = f"❌ {ticket_data['error']}"
+            error_msg = _STATUS_FAIL_TMPL.format(err=_jira_error(ticket_data))
             await gallabox_service.send_text_message(user_phone, error_msg)
             return {
                 "action": "ticket_not_found",
@@ -756,14 +1060,12 @@ class IntentService:
         ticket_key = intent_result.ticket_key
         
         if not ticket_key:
-            match = re.search(r'\b([A-Z]{2,}-\d+)\b', message_text, re.IGNORECASE)
+            match = _TICKET_KEY_RE.search(message_text)
             if match:
                 ticket_key = match.group(1).upper()
         
         if not ticket_key:
-            msg = "Please provide the ticket number you'd like to update (e.g., SUP-123)."
-            if detected_language == Language.ARABIC:
-                msg = "يرجى تقديم رقم التذكرة التي ترغب في تحديثها (مثال: SUP-123)."
+            msg = _templates(detected_language)["ticket_key_prompt_update"]
             
             await gallabox_service.send_text_message(user_phone, msg)
             return {
@@ -771,24 +1073,31 @@ class IntentService:
                 "response_sent": True
             }
         
-        comment = f"*Comment from user via WhatsApp:*\n{message_text}\n\n_Added by: {user_name} ({user_phone})_"
+        comment = _COMMENT_PREFIX + message_text + _comment_suffix(user_name, user_phone)
         
-        result = await jira_service.update_ticket(
+        update_call = jira_service.update_ticket(
             ticket_key=ticket_key,
             comment=comment,
             priority=intent_result.priority
         )
         
+        if settings.OPTIMISTIC_JIRA_ACK:
+            # Acknowledge now; only follow up if Jira rejects the update
+            self._run_in_background(
+                self._finish_jira_call(update_call, user_phone, _UPDATE_FAIL_TMPL)
+            )
+            result = {"success": True, "optimistic": True}
+        else:
+            result = await update_call
+        
         if result['success']:
-            success_msg = f"✅ Ticket *{ticket_key}* has been updated with your comment."
-            if detected_language == Language.ARABIC:
-                success_msg = f"✅ تم تحديث التذكرة *{ticket_key}* بتعليقك."
+            success_msg = _templates(detected_language)["update_success"].format(key=ticket_key)
             
             await gallabox_service.send_text_message(user_phone, success_msg)
         else:
             await gallabox_service.send_text_message(
                 user_phone,
-                f"❌ Failed to update ticket: {result.get('error')}"
+                _UPDATE_FAIL_TMPL.format(err=_jira_error(result))
             )
         
         return {
@@ -811,14 +1120,12 @@ class IntentService:
         ticket_key = intent_result.ticket_key
         
         if not ticket_key:
-            match = re.search(r'\b([A-Z]{2,}-\d+)\b', message_text, re.IGNORECASE)
+            match = _TICKET_KEY_RE.search(message_text)
             if match:
                 ticket_key = match.group(1).upper()
         
         if not ticket_key:
-            msg = "Which ticket would you like to close? Please provide the ticket number."
-            if detected_language == Language.ARABIC:
-                msg = "أي تذكرة ترغب في إغلاقها؟ يرجى تقديم رقم التذكرة."
+            msg = _templates(detected_language)["ticket_key_prompt_close"]
             
             await gallabox_service.send_text_message(user_phone, msg)
             return {
@@ -826,18 +1133,25 @@ class IntentService:
                 "response_sent": True
             }
         
-        result = await jira_service.close_ticket(ticket_key)
+        close_call = jira_service.close_ticket(ticket_key)
+        
+        if settings.OPTIMISTIC_JIRA_ACK:
+            # Acknowledge now; only follow up if Jira rejects the close
+            self._run_in_background(
+                self._finish_jira_call(close_call, user_phone, _CLOSE_FAIL_TMPL)
+            )
+            result = {"success": True, "optimistic": True}
+        else:
+            result = await close_call
         
         if result['success']:
-            success_msg = f"✅ Ticket *{ticket_key}* has been closed.\n\nThank you for confirming!"
-            if detected_language == Language.ARABIC:
-                success_msg = f"✅ تم إغلاق التذكرة *{ticket_key}*.\n\nشكراً لك على التأكيد!"
+            success_msg = _templates(detected_language)["close_success"].format(key=ticket_key)
             
             await gallabox_service.send_text_message(user_phone, success_msg)
         else:
             await gallabox_service.send_text_message(
                 user_phone,
-                f"❌ Failed to close ticket: {result.get('error')}"
+                _CLOSE_FAIL_TMPL.format(err=_jira_error(result))
             )
         
         return {
@@ -856,23 +1170,7 @@ class IntentService:
         detected_language: Language
     ) -> Dict[str, Any]:
         """Handle property inquiry (redirect to sales)"""
-        
-        redirect_msg = await multilingual_service.get_smart_response(
-            "property_redirect",
-            message_text,
-            user_phone,
-            name=user_name,
-            email=settings.WHATSAPP_BUSINESS_EMAIL,
-            website=settings.WHATSAPP_BUSINESS_WEBSITE
-        )
-        
-        await gallabox_service.send_text_message(user_phone, redirect_msg)
-        
-        return {
-            "intent": "property_inquiry",
-            "action": "redirected_to_sales",
-            "response_sent": True
-        }
+        return await self._handle_sales_redirect("property_inquiry", user_phone, user_name, message_text)
     
     async def _handle_schedule_viewing(
         self,
@@ -883,20 +1181,46 @@ class IntentService:
         detected_language: Language
     ) -> Dict[str, Any]:
         """Handle viewing schedule request"""
+        return await self._handle_sales_redirect("schedule_viewing", user_phone, user_name, message_text)
+    
+    async def _sales_redirect_message(
+        self,
+        user_phone: str,
+        user_name: str,
+        message_text: str
+    ) -> str:
+        """Localized sales redirect text (cached for every redirect path)"""
+        # The reply only depends on the name and the language of the message
+        cache_key = ("property_redirect", _detect_language(message_text)[0], user_name)
+        redirect_msg = self._redirect_cache.get(cache_key)
+        
+        if redirect_msg is None:
+            redirect_msg = await multilingual_service.get_smart_response(
+                "property_redirect",
+                message_text,
+                user_phone,
+                name=user_name,
+                email=settings.WHATSAPP_BUSINESS_EMAIL,
+                website=settings.WHATSAPP_BUSINESS_WEBSITE
+            )
+            self._redirect_cache.set(cache_key, redirect_msg)
         
-        redirect_msg = await multilingual_service.get_smart_response(
-            "property_redirect",
-            message_text,
-            user_phone,
-            name=user_name,
-            email=settings.WHATSAPP_BUSINESS_EMAIL,
-            website=settings.WHATSAPP_BUSINESS_WEBSITE
-        )
+        return redirect_msg
+    
+    async def _handle_sales_redirect(
+        self,
+        intent_name: str,
+        user_phone: str,
+        user_name: str,
+        message_text: str
+    ) -> Dict[str, Any]:
+        """Send the sales redirect (shared by property/viewing intents)"""
+        redirect_msg = await self._sales_redirect_message(user_phone, user_name, message_text)
         
         await gallabox_service.send_text_message(user_phone, redirect_msg)
         
         return {
-            "intent": "schedule_viewing",
+            "intent": intent_name,
             "action": "redirected_to_sales",
             "response_sent": True
         }
@@ -914,32 +1238,12 @@ class IntentService:
         """
         
         # Simple greeting template
-        greeting = f"""Hello {user_name}! 👋
-
-I'm your Jira Support Assistant. I can help you with:
-• Create support tickets
-• Check ticket status  
-• Update existing tickets
-
-What can I help you with today?"""
-        
-        if detected_language == Language.ARABIC:
-            greeting = f"""مرحباً {user_name}! 👋
-
-أنا مساعد دعم Jira. يمكنني مساعدتك في:
-• إنشاء تذاكر الدعم
-• التحقق من حالة التذكرة
-• تحديث التذاكر الموجودة
-
-كيف يمكنني مساعدتك اليوم؟"""
+        greeting = _render_greeting(user_name, detected_language)
         
         await gallabox_service.send_text_message(user_phone, greeting)
         
-        conversation_memory.add_message(
-            user_phone,
-            MessageRole.AGENT,
-            greeting,
-            intent="general_response"
+        self._run_in_background(
+            self._record_agent_reply(user_phone, greeting, "general_response")
         )
         
         return {
@@ -952,9 +1256,24 @@ What can I help you with today?"""
     # LEGACY METHODS
     # ==========================================
     
-    def _get_conversation_history(self, user_phone: str) -> List[Dict]:
-        """Legacy method"""
-        return conversation_memory.get_recent_context(user_phone, messages=5)
+    def _get_conversation_history(
+        self,
+        user_phone: str,
+        request_cache: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Recent conversation context (last 5 messages)
+        
+        Pass a per-request dict as `request_cache` so repeated lookups while
+        handling one message hit the conversation store only once.
+        """
+        if request_cache is None:
+            return conversation_memory.get_recent_context(user_phone, messages=5)
+        
+        key = ("recent", user_phone, 5)
+        if key not in request_cache:
+            request_cache[key] = conversation_memory.get_recent_context(user_phone, messages=5)
+        return request_cache[key]
     
     def _update_context(
         self, 
@@ -963,19 +1282,29 @@ What can I help you with today?"""
         intent: str,
         confidence: float
     ):
-        """Legacy context update"""
-        if user_phone not in self._conversation_context:
-            self._conversation_context[user_phone] = []
-        
-        self._conversation_context[user_phone].append({
-            "message": message[:100],
-            "intent": intent,
-            "confidence": confidence,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        if len(self._conversation_context[user_phone]) > 10:
-            self._conversation_context[user_phone] = self._conversation_context[user_phone][-10:]
+        """Legacy context update (last 10 entries per user, idle users expire)"""
+        # Snippet as UTF-8 bytes (compact for Arabic text); timestamp in epoch
+        # seconds, format with _fmt_ts() when exporting
+        snippet = message[:100].encode("utf-8")
+        self._conversation_context[user_phone].append(snippet, intent, confidence, time.time())
+        
+        now = time.monotonic()
+        ttl = self._context_max_age_minutes * 60
+        self._context_last_seen[user_phone] = now
+        heapq.heappush(self._context_expiry, (now + ttl, user_phone))
+        
+        # Evict users idle for longer than the TTL (stale heap entries are skipped)
+        expiry = self._context_expiry
+        while expiry and expiry[0][0] <= now:
+            _, phone = heapq.heappop(expiry)
+            if self._context_last_seen.get(phone, now) + ttl <= now:
+                self._conversation_context.pop(phone, None)
+                del self._context_last_seen[phone]
+    
+    @staticmethod
+    def _fmt_ts(timestamp: float) -> str:
+        """Format a stored context timestamp as ISO-8601"""
+        return datetime.fromtimestamp(timestamp).isoformat()
     
     def cleanup_old_pending_tickets(self):
         """Cleanup old pending tickets"""
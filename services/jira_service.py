@@ -5,56 +5,253 @@ Complete ticket lifecycle management with better error handling
 
 from jira import JIRA
 from jira.exceptions import JIRAError
+from requests.adapters import HTTPAdapter
 from config.settings import settings
 from models.schemas import JiraProject, Priority, TicketPreview
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Callable
 from datetime import datetime
-import json
+import asyncio
+import functools
+import logging
+import random
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Transient Jira responses worth retrying (throttled / gateway / overloaded)
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+# Responses where Jira refused the request up front - safe to retry even writes
+_REJECTED_STATUS = frozenset({429, 503})
+_MAX_ATTEMPTS = 3
+
+# Field projections - only fetch what the response dicts actually read
+_STATUS_FIELDS = "summary,status,priority,assignee,reporter,created,updated,description"
+_SEARCH_FIELDS = "summary,status,priority,created"
+_WORKFLOW_FIELDS = "project,issuetype,status"
+
+# Map Priority enum to Jira priority names (first available wins)
+_PRIORITY_MAPPING = {
+    "Critical": ("Critical", "Highest", "P1"),
+    "High": ("High", "P2"),
+    "Medium": ("Medium", "P3"),
+    "Low": ("Low", "Lowest", "P4")
+}
+
+# Valid issue keys (also keeps user input out of bulk JQL)
+_ISSUE_KEY_RE = re.compile(r'^[A-Z][A-Z0-9_]+-\d+$')
+
+
+@functools.lru_cache(maxsize=4096)
+def _fmt_jira_date(value: Optional[str]) -> str:
+    """Jira ISO timestamp -> 'YYYY-MM-DD HH:MM' (raw value if unparseable)"""
+    if not value:
+        return ''
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M')
+    except ValueError:
+        return value
+
+
+# Formatting characters stripped from phone numbers ("+49 151-..." == "+49151...")
+_PHONE_FORMATTING = str.maketrans('', '', ' -().')
+
+
+def _jql_quote(value: str) -> str:
+    """Quote a value as a JQL string literal"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+@functools.lru_cache(maxsize=1024)
+def _build_search_jql(user_phone: Optional[str], project_key: Optional[str], status: Optional[str]) -> str:
+    """JQL for search_tickets (cached per criteria tuple)"""
+    jql_parts = []
+    
+    if user_phone:
+        phone = _jql_quote(user_phone)
+        jql_parts.append(f'(description ~ {phone} OR summary ~ {phone})')
+    
+    if project_key:
+        jql_parts.append(f'project = {_jql_quote(project_key)}')
+    
+    if status:
+        jql_parts.append(f'status = {_jql_quote(status)}')
+    
+    if not jql_parts:
+        jql_parts.append('project IS NOT EMPTY')
+    
+    return ' AND '.join(jql_parts) + ' ORDER BY created DESC'
+
+
+def _ticket_status(issue: Any, ticket_key: str) -> Dict[str, Any]:
+    """get_ticket_status response for a fetched issue"""
+    fields = issue.fields
+    return {
+        'success': True,
+        'ticket_key': ticket_key,
+        'summary': fields.summary,
+        'status': fields.status.name,
+        'priority': fields.priority.name if fields.priority else 'None',
+        'assignee': fields.assignee.displayName if fields.assignee else 'Unassigned',
+        'reporter': fields.reporter.displayName if fields.reporter else 'Unknown',
+        'created': _fmt_jira_date(fields.created),
+        'updated': _fmt_jira_date(fields.updated),
+        'description': fields.description or 'No description',
+        'url': f"{settings.JIRA_HOST}/browse/{ticket_key}"
+    }
 
 class JiraService:
     def __init__(self):
+        # Project metadata (issue types per project, global priorities),
+        # refreshed every _metadata_ttl seconds
+        self._issue_types_cache: Dict[str, Tuple[float, List[str]]] = {}
+        self._priorities_cache: Optional[Tuple[float, List[str]]] = None
+        # Workflow transitions keyed by (project, issue type, current status)
+        self._transitions_cache: Dict[Tuple[str, str, str], Tuple[float, Dict[str, Dict]]] = {}
+        self._metadata_ttl = 600
+        
+        # Outbound throttle: bounded concurrency + minimum spacing between calls
+        self._sem = asyncio.Semaphore(settings.JIRA_MAX_CONCURRENCY)
+        self._min_interval = 1.0 / settings.JIRA_MAX_RPS
+        self._next_call = 0.0
+        
+        # In-flight get_ticket_status lookups, shared by concurrent callers
+        self._inflight_status: Dict[str, asyncio.Task] = {}
+        
+        self.default_project = settings.JIRA_PROJECT_KEY
+        
+        # JIRA() does a server round-trip, so connect on first use, not at import
+        self._client: Optional[JIRA] = None
+        self._connected = False
+    
+    def _connect(self):
+        """Create the Jira client (once; stays None if initialization fails)"""
+        if self._connected:
+            return
+        
         try:
-            self.client = JIRA(
+            self._client = JIRA(
                 server=settings.JIRA_HOST,
-                basic_auth=(settings.JIRA_EMAIL, settings.JIRA_API_TOKEN)
+                basic_auth=(settings.JIRA_EMAIL, settings.JIRA_API_TOKEN),
+                # _call owns retries; the session's own 429 retries would multiply them
+                max_retries=0
             )
-            self.default_project = settings.JIRA_PROJECT_KEY
-            print(f"✅ Jira client initialized: {settings.JIRA_HOST}")
+            
+            # Keep-alive pool sized for _call()'s concurrency so worker threads
+            # reuse warm TLS connections instead of opening throwaway ones
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(10, settings.JIRA_MAX_CONCURRENCY))
+            self._client._session.mount("https://", adapter)
+            self._client._session.mount("http://", adapter)
+            logger.info("✅ Jira client initialized: %s", settings.JIRA_HOST)
         except Exception as e:
-            print(f"❌ Jira initialization failed: {e}")
-            self.client = None
+            logger.error("❌ Jira initialization failed: %s", e)
+            self._client = None
+        self._connected = True
+    
+    @property
+    def client(self) -> Optional[JIRA]:
+        """Jira client, connected lazily on first access"""
+        if not self._connected:
+            self._connect()
+        return self._client
+    
+    async def _call(self, fn: Callable, *args, idempotent: bool = True, **kwargs) -> Any:
+        """
+        Run a blocking Jira client call in a worker thread
+        
+        Every REST call goes through here so webhook bursts can't exceed
+        JIRA_MAX_CONCURRENCY in flight or JIRA_MAX_RPS overall. 429/5xx
+        responses are retried with jittered exponential backoff (1s, 2s),
+        honoring Retry-After when Jira sends it.
+        
+        Pass idempotent=False for writes (create, comment, transition,
+        upload): a 500/502/504 may mean Jira already applied them, so those
+        only retry on 429/503.
+        """
+        retryable = _RETRYABLE_STATUS if idempotent else _REJECTED_STATUS
+        for attempt in range(_MAX_ATTEMPTS):
+            try:
+                async with self._sem:
+                    # Reserve the next free slot before sleeping so concurrent callers space out
+                    now = time.monotonic()
+                    slot = max(now, self._next_call)
+                    self._next_call = slot + self._min_interval
+                    if slot > now:
+                        await asyncio.sleep(slot - now)
+                    
+                    return await asyncio.to_thread(fn, *args, **kwargs)
+            except JIRAError as e:
+                if e.status_code not in retryable or attempt == _MAX_ATTEMPTS - 1:
+                    raise
+                
+                # Back off outside the semaphore so other calls keep flowing
+                delay = self._retry_after(e) or (2 ** attempt) + random.random()
+                logger.warning(
+                    "⏳ Jira returned %s, retrying in %.1fs (attempt %d/%d)",
+                    e.status_code, delay, attempt + 1, _MAX_ATTEMPTS
+                )
+                await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _retry_after(error: JIRAError) -> Optional[float]:
+        """Seconds from a Retry-After header (None if absent or not numeric)"""
+        response = getattr(error, 'response', None)
+        if response is None:
+            return None
+        
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
     
     async def test_jira_connection(self) -> bool:
-        """Test Jira connection"""
+        """Test Jira connection (connects the client off the event loop)"""
         try:
+            if not self._connected:
+                await asyncio.to_thread(self._connect)
+            
             if not self.client:
                 return False
             
             # Try to fetch current user info
-            user = self.client.myself()
-            print(f"✅ Jira connected as: {user.get('displayName', 'Unknown')}")
+            user = await self._call(self.client.myself)
+            logger.info("✅ Jira connected as: %s", user.get('displayName', 'Unknown'))
             return True
         except JIRAError as e:
-            print(f"❌ Jira connection test failed: {e.status_code} - {e.text}")
+            logger.error("❌ Jira connection test failed: %s - %s", e.status_code, e.text)
             return False
         except Exception as e:
-            print(f"❌ Jira connection error: {e}")
+            logger.error("❌ Jira connection error: %s", e)
             return False
     
-    def _get_project_issue_types(self, project_key: str) -> List[str]:
-        """Get available issue types for a project"""
+    async def _get_project_issue_types(self, project_key: str) -> List[str]:
+        """
+        Get available issue types for a project (cached)
+        
+        Raises JIRAError (404) if the project doesn't exist
+        """
+        entry = self._issue_types_cache.get(project_key)
+        if entry and time.monotonic() - entry[0] < self._metadata_ttl:
+            return entry[1]
+        
         try:
-            project = self.client.project(project_key)
+            project = await self._call(self.client.project, project_key)
             issue_types = [it.name for it in project.issueTypes]
-            print(f"📋 Available issue types for {project_key}: {issue_types}")
+            logger.debug("📋 Available issue types for %s: %s", project_key, issue_types)
+            self._issue_types_cache[project_key] = (time.monotonic(), issue_types)
             return issue_types
+        except JIRAError as e:
+            if e.status_code == 404:
+                raise
+            logger.warning("⚠️ Could not fetch issue types: %s", e)
+            return ["Task", "Bug", "Story"]
         except Exception as e:
-            print(f"⚠️ Could not fetch issue types: {e}")
+            logger.warning("⚠️ Could not fetch issue types: %s", e)
             return ["Task", "Bug", "Story"]
     
-    def _get_valid_issue_type(self, project_key: str, requested_type: str = "Task") -> str:
+    async def _get_valid_issue_type(self, project_key: str, requested_type: str = "Task") -> str:
         """Get a valid issue type for the project"""
-        available_types = self._get_project_issue_types(project_key)
+        available_types = await self._get_project_issue_types(project_key)
         
         # Check if requested type is available
         if requested_type in available_types:
@@ -63,41 +260,47 @@ class JiraService:
         # Try common alternatives
         for alt_type in ["Task", "Bug", "Story", "Epic"]:
             if alt_type in available_types:
-                print(f"⚠️ Using {alt_type} instead of {requested_type}")
+                logger.warning("⚠️ Using %s instead of %s", alt_type, requested_type)
                 return alt_type
         
         # Return first available type
         if available_types:
-            print(f"⚠️ Using {available_types[0]} as fallback")
+            logger.warning("⚠️ Using %s as fallback", available_types[0])
             return available_types[0]
         
         return "Task"  # Ultimate fallback
     
-    def _get_project_priorities(self, project_key: str) -> List[str]:
-        """Get available priorities"""
+    async def _get_project_priorities(self, project_key: str) -> List[str]:
+        """Get available priorities (cached; priorities are global in Jira)"""
+        entry = self._priorities_cache
+        if entry and time.monotonic() - entry[0] < self._metadata_ttl:
+            return entry[1]
+        
         try:
-            priorities = self.client.priorities()
+            priorities = await self._call(self.client.priorities)
             priority_names = [p.name for p in priorities]
-            print(f"🎯 Available priorities: {priority_names}")
+            logger.debug("🎯 Available priorities: %s", priority_names)
+            self._priorities_cache = (time.monotonic(), priority_names)
             return priority_names
         except Exception as e:
-            print(f"⚠️ Could not fetch priorities: {e}")
+            logger.warning("⚠️ Could not fetch priorities: %s", e)
             return ["Medium", "High", "Low"]
     
-    def _get_valid_priority(self, requested_priority: Priority) -> Optional[str]:
+    def invalidate_project_cache(self, project_key: Optional[str] = None):
+        """Drop cached metadata (one project's issue types, or everything)"""
+        if project_key:
+            self._issue_types_cache.pop(project_key, None)
+        else:
+            self._issue_types_cache.clear()
+            self._priorities_cache = None
+            self._transitions_cache.clear()
+    
+    async def _get_valid_priority(self, requested_priority: Priority) -> Optional[str]:
         """Get a valid priority name or None if not supported"""
-        available_priorities = self._get_project_priorities(self.default_project)
-        
-        # Map Priority enum to Jira priority names
-        priority_mapping = {
-            "Critical": ["Critical", "Highest", "P1"],
-            "High": ["High", "P2"],
-            "Medium": ["Medium", "P3"],
-            "Low": ["Low", "Lowest", "P4"]
-        }
+        available_priorities = set(await self._get_project_priorities(self.default_project))
         
         # Try to find matching priority
-        for jira_priority in priority_mapping.get(requested_priority.value, []):
+        for jira_priority in _PRIORITY_MAPPING.get(requested_priority.value, ()):
             if jira_priority in available_priorities:
                 return jira_priority
         
@@ -105,17 +308,36 @@ class JiraService:
         if requested_priority.value in available_priorities:
             return requested_priority.value
         
-        print(f"⚠️ Priority {requested_priority.value} not supported in this Jira instance")
+        logger.warning("⚠️ Priority %s not supported in this Jira instance", requested_priority.value)
         return None
     
+    async def _get_transitions(self, issue: Any) -> Dict[str, Dict]:
+        """
+        Transitions available from the issue's current status (cached)
+        
+        Keyed by lowercased transition name. Transitions come from the
+        workflow, so issues sharing project, type and status share them.
+        """
+        fields = issue.fields
+        key = (fields.project.key, fields.issuetype.name, fields.status.name)
+        
+        entry = self._transitions_cache.get(key)
+        if entry and time.monotonic() - entry[0] < self._metadata_ttl:
+            return entry[1]
+        
+        transitions = await self._call(self.client.transitions, issue)
+        by_name = {t['name'].lower(): t for t in transitions}
+        self._transitions_cache[key] = (time.monotonic(), by_name)
+        return by_name
+    
     async def get_all_projects(self) -> List[JiraProject]:
         """Fetch all accessible Jira projects"""
         try:
             if not self.client:
-                print("❌ Jira client not initialized")
+                logger.error("❌ Jira client not initialized")
                 return []
             
-            projects = self.client.projects()
+            projects = await self._call(self.client.projects)
             
             project_list = []
             for p in projects:
@@ -129,17 +351,17 @@ class JiraService:
                         )
                     )
                 except Exception as e:
-                    print(f"⚠️  Error parsing project {p.key}: {e}")
+                    logger.warning("⚠️ Error parsing project %s: %s", p.key, e)
                     continue
             
-            print(f"📊 Fetched {len(project_list)} Jira projects")
+            logger.debug("📊 Fetched %d Jira projects", len(project_list))
             return project_list
             
         except JIRAError as e:
-            print(f"❌ Failed to fetch Jira projects: {e.status_code} - {e.text}")
+            logger.error("❌ Failed to fetch Jira projects: %s - %s", e.status_code, e.text)
             return []
         except Exception as e:
-            print(f"❌ Error fetching projects: {e}")
+            logger.error("❌ Error fetching projects: %s", e)
             return []
     
     async def create_ticket(
@@ -160,19 +382,15 @@ class JiraService:
                     'error': 'Jira client not initialized'
                 }
             
-            # Validate project exists
+            # Get valid issue type (the project lookup also validates the key)
             try:
-                project = self.client.project(project_key)
-                print(f"✅ Project validated: {project.name}")
-            except JIRAError as e:
+                valid_issue_type = await self._get_valid_issue_type(project_key, issue_type)
+            except JIRAError:
                 return {
                     'success': False,
                     'error': f'Project {project_key} not found or not accessible'
                 }
             
-            # Get valid issue type
-            valid_issue_type = self._get_valid_issue_type(project_key, issue_type)
-            
             # Prepare minimal issue dictionary (only required fields)
             issue_dict = {
                 'project': {'key': project_key},
@@ -185,31 +403,30 @@ class JiraService:
                 issue_dict['description'] = description
             
             # Add priority if supported
-            valid_priority = self._get_valid_priority(priority)
+            valid_priority = await self._get_valid_priority(priority)
             if valid_priority:
                 issue_dict['priority'] = {'name': valid_priority}
             
             # IMPORTANT: Don't add assignee/reporter unless you have valid account IDs
             # Most 400 errors come from invalid assignee/reporter values
             
-            print(f"📝 Creating issue with fields:")
-            print(f"   Project: {project_key}")
-            print(f"   Summary: {summary[:50]}...")
-            print(f"   Issue Type: {valid_issue_type}")
-            print(f"   Priority: {valid_priority}")
+            logger.debug(
+                "📝 Creating issue | Project: %s | Summary: %.50s... | Issue Type: %s | Priority: %s",
+                project_key, summary, valid_issue_type, valid_priority
+            )
             
             # Create the issue
-            new_issue = self.client.create_issue(fields=issue_dict)
+            new_issue = await self._call(self.client.create_issue, fields=issue_dict, idempotent=False)
             
-            print(f"✅ Jira ticket created: {new_issue.key}")
+            logger.info("✅ Jira ticket created: %s", new_issue.key)
             
             # Try to assign after creation (safer approach)
             if assignee:
                 try:
-                    self.client.assign_issue(new_issue, assignee)
-                    print(f"✅ Assigned to {assignee}")
+                    await self._call(self.client.assign_issue, new_issue, assignee)
+                    logger.debug("✅ Assigned to %s", assignee)
                 except Exception as e:
-                    print(f"⚠️ Could not assign to {assignee}: {e}")
+                    logger.warning("⚠️ Could not assign to %s: %s", assignee, e)
             
             return {
                 'success': True,
@@ -238,26 +455,38 @@ class JiraService:
                         error_details = ', '.join([f"{k}: {v}" for k, v in errors.items()])
                         error_msg = f"Field errors: {error_details}"
                     
-                    print(f"❌ Detailed error: {json.dumps(error_data, indent=2)}")
+                    logger.debug("❌ Detailed error: %s", error_data)
                 except:
                     error_msg = e.text
             
-            print(f"❌ Failed to create Jira ticket: {error_msg}")
+            logger.error("❌ Failed to create Jira ticket: %s", error_msg)
             return {
                 'success': False,
                 'error': error_msg
             }
         except Exception as e:
-            print(f"❌ Error creating ticket: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error creating ticket: %s", e)
             return {
                 'success': False,
                 'error': str(e)
             }
     
     async def get_ticket_status(self, ticket_key: str) -> Dict[str, Any]:
-        """Get current status of a ticket"""
+        """
+        Get current status of a ticket
+        
+        Concurrent lookups of the same key share one Jira request.
+        """
+        task = self._inflight_status.get(ticket_key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_ticket_status(ticket_key))
+            self._inflight_status[ticket_key] = task
+            task.add_done_callback(lambda _: self._inflight_status.pop(ticket_key, None))
+        
+        # Shield so one caller being cancelled doesn't cancel the shared lookup
+        return await asyncio.shield(task)
+    
+    async def _fetch_ticket_status(self, ticket_key: str) -> Dict[str, Any]:
         try:
             if not self.client:
                 return {
@@ -265,37 +494,8 @@ class JiraService:
                     'error': 'Jira client not initialized'
                 }
             
-            issue = self.client.issue(ticket_key)
-            
-            # Parse dates
-            created = issue.fields.created
-            updated = issue.fields.updated
-            
-            try:
-                created_dt = datetime.fromisoformat(created.replace('Z', '+00:00'))
-                created_str = created_dt.strftime('%Y-%m-%d %H:%M')
-            except:
-                created_str = created
-            
-            try:
-                updated_dt = datetime.fromisoformat(updated.replace('Z', '+00:00'))
-                updated_str = updated_dt.strftime('%Y-%m-%d %H:%M')
-            except:
-                updated_str = updated
-            
-            return {
-                'success': True,
-                'ticket_key': ticket_key,
-                'summary': issue.fields.summary,
-                'status': issue.fields.status.name,
-                'priority': issue.fields.priority.name if issue.fields.priority else 'None',
-                'assignee': issue.fields.assignee.displayName if issue.fields.assignee else 'Unassigned',
-                'reporter': issue.fields.reporter.displayName if issue.fields.reporter else 'Unknown',
-                'created': created_str,
-                'updated': updated_str,
-                'description': issue.fields.description or 'No description',
-                'url': f"{settings.JIRA_HOST}/browse/{ticket_key}"
-            }
+            issue = await self._call(self.client.issue, ticket_key, fields=_STATUS_FIELDS)
+            return _ticket_status(issue, ticket_key)
             
         except JIRAError as e:
             if e.status_code == 404:
@@ -303,18 +503,60 @@ class JiraService:
             else:
                 error_msg = f"Jira API Error: {e.status_code}"
             
-            print(f"❌ Failed to fetch ticket {ticket_key}: {error_msg}")
+            logger.error("❌ Failed to fetch ticket %s: %s", ticket_key, error_msg)
             return {
                 'success': False,
                 'error': error_msg
             }
         except Exception as e:
-            print(f"❌ Error fetching ticket {ticket_key}: {e}")
+            logger.error("❌ Error fetching ticket %s: %s", ticket_key, e)
             return {
                 'success': False,
                 'error': f"Ticket {ticket_key} not found or inaccessible"
             }
     
+    async def get_ticket_statuses_bulk(self, ticket_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Status of many tickets with one JQL search
+        
+        Returns {ticket_key: get_ticket_status-shaped dict}; keys that are
+        malformed or not found map to a failure dict.
+        """
+        keys = list(dict.fromkeys(k.upper() for k in ticket_keys))
+        results: Dict[str, Dict[str, Any]] = {}
+        
+        if not keys:
+            return results
+        
+        if not self.client:
+            error = {'success': False, 'error': 'Jira client not initialized'}
+            return {k: error for k in keys}
+        
+        valid = [k for k in keys if _ISSUE_KEY_RE.match(k)]
+        if valid:
+            jql = f"key in ({','.join(valid)})"
+            try:
+                issues = await self._call(
+                    self.client.search_issues, jql, maxResults=len(valid), fields=_STATUS_FIELDS
+                )
+                for issue in issues:
+                    results[issue.key] = _ticket_status(issue, issue.key)
+            except JIRAError as e:
+                if e.status_code != 400:
+                    logger.error("❌ Bulk ticket lookup failed: %s - %s", e.status_code, e.text)
+                else:
+                    # JQL rejects the whole query if any key doesn't exist - look up one by one
+                    statuses = await asyncio.gather(*(self.get_ticket_status(k) for k in valid))
+                    results.update(zip(valid, statuses))
+            except Exception as e:
+                logger.error("❌ Error in bulk ticket lookup: %s", e)
+        
+        for key in keys:
+            if key not in results:
+                results[key] = {'success': False, 'error': f"Ticket {key} not found"}
+        
+        return results
+    
     async def update_ticket(
         self,
         ticket_key: str,
@@ -331,43 +573,59 @@ class JiraService:
                     'error': 'Jira client not initialized'
                 }
             
-            issue = self.client.issue(ticket_key)
-            
-            # Add comment
-            if comment:
-                self.client.add_comment(issue, comment)
-                print(f"✅ Comment added to {ticket_key}")
+            issue = await self._call(self.client.issue, ticket_key, fields=_WORKFLOW_FIELDS)
             
             # Update fields
             update_fields = {}
             
             if priority:
-                valid_priority = self._get_valid_priority(priority)
+                valid_priority = await self._get_valid_priority(priority)
                 if valid_priority:
                     update_fields['priority'] = {'name': valid_priority}
             
             if assignee:
                 update_fields['assignee'] = {'accountId': assignee}
             
+            # Resolve the requested transition (cached per workflow state)
+            transition_id = None
+            if status:
+                transition = (await self._get_transitions(issue)).get(status.lower())
+                if transition:
+                    transition_id = transition['id']
+                else:
+                    logger.warning("⚠️ Status '%s' not available for %s", status, ticket_key)
+            
+            # Comment + fields + transition in one POST when the transition
+            # screen accepts them; Jira rejects the whole request with 400 if
+            # not, and nothing is applied, so fall back to separate calls
+            if transition_id and (comment or update_fields):
+                try:
+                    await self._call(
+                        self.client.transition_issue, issue, transition_id,
+                        fields=update_fields, comment=comment, idempotent=False
+                    )
+                    logger.info("✅ Status changed to %s for %s (with comment/fields)", status, ticket_key)
+                    comment = None
+                    update_fields = {}
+                    transition_id = None
+                except JIRAError as e:
+                    if e.status_code != 400:
+                        raise
+                    logger.debug("Combined transition rejected for %s, updating separately", ticket_key)
+            
+            # Add comment
+            if comment:
+                await self._call(self.client.add_comment, issue, comment, idempotent=False)
+                logger.debug("✅ Comment added to %s", ticket_key)
+            
             if update_fields:
-                issue.update(fields=update_fields)
-                print(f"✅ Fields updated for {ticket_key}")
+                await self._call(issue.update, fields=update_fields)
+                logger.debug("✅ Fields updated for %s", ticket_key)
             
             # Transition status if requested
-            if status:
-                transitions = self.client.transitions(issue)
-                transition_id = None
-                
-                for t in transitions:
-                    if t['name'].lower() == status.lower():
-                        transition_id = t['id']
-                        break
-                
-                if transition_id:
-                    self.client.transition_issue(issue, transition_id)
-                    print(f"✅ Status changed to {status} for {ticket_key}")
-                else:
-                    print(f"⚠️  Status '{status}' not available for {ticket_key}")
+            if transition_id:
+                await self._call(self.client.transition_issue, issue, transition_id, idempotent=False)
+                logger.info("✅ Status changed to %s for %s", status, ticket_key)
             
             return {
                 'success': True,
@@ -377,13 +635,13 @@ class JiraService:
             
         except JIRAError as e:
             error_msg = f"Jira API Error: {e.status_code}"
-            print(f"❌ Failed to update ticket {ticket_key}: {error_msg}")
+            logger.error("❌ Failed to update ticket %s: %s", ticket_key, error_msg)
             return {
                 'success': False,
                 'error': error_msg
             }
         except Exception as e:
-            print(f"❌ Error updating ticket {ticket_key}: {e}")
+            logger.error("❌ Error updating ticket %s: %s", ticket_key, e)
             return {
                 'success': False,
                 'error': str(e)
@@ -398,39 +656,38 @@ class JiraService:
                     'error': 'Jira client not initialized'
                 }
             
-            issue = self.client.issue(ticket_key)
+            issue = await self._call(self.client.issue, ticket_key, fields=_WORKFLOW_FIELDS)
             
             # Get available transitions
-            transitions = self.client.transitions(issue)
+            transitions = await self._get_transitions(issue)
             
             # Find "Done" or "Closed" transition
             done_transition = None
-            for t in transitions:
-                t_name = t['name'].lower()
+            for t_name, t in transitions.items():
                 if any(keyword in t_name for keyword in ['done', 'closed', 'resolved', 'complete', 'finish']):
                     done_transition = t['id']
-                    print(f"✅ Found transition: {t['name']}")
+                    logger.debug("✅ Found transition: %s", t['name'])
                     break
             
             if done_transition:
-                self.client.transition_issue(issue, done_transition)
+                await self._call(self.client.transition_issue, issue, done_transition, idempotent=False)
                 
                 # Try to set resolution
                 try:
-                    issue.update(fields={'resolution': {'name': resolution}})
+                    await self._call(issue.update, fields={'resolution': {'name': resolution}})
                 except:
-                    print(f"⚠️  Could not set resolution to {resolution}")
+                    logger.warning("⚠️ Could not set resolution to %s", resolution)
                 
-                print(f"✅ Ticket {ticket_key} closed")
+                logger.info("✅ Ticket %s closed", ticket_key)
                 return {
                     'success': True,
                     'ticket_key': ticket_key,
                     'message': f'Ticket {ticket_key} has been closed'
                 }
             else:
-                available = [t['name'] for t in transitions]
+                available = [t['name'] for t in transitions.values()]
                 error_msg = f"No close transition found. Available: {', '.join(available)}"
-                print(f"⚠️  {error_msg}")
+                logger.warning("⚠️ %s", error_msg)
                 return {
                     'success': False,
                     'error': error_msg
@@ -438,13 +695,13 @@ class JiraService:
             
         except JIRAError as e:
             error_msg = f"Jira API Error: {e.status_code}"
-            print(f"❌ Failed to close ticket {ticket_key}: {error_msg}")
+            logger.error("❌ Failed to close ticket %s: %s", ticket_key, error_msg)
             return {
                 'success': False,
                 'error': error_msg
             }
         except Exception as e:
-            print(f"❌ Error closing ticket {ticket_key}: {e}")
+            logger.error("❌ Error closing ticket %s: %s", ticket_key, e)
             return {
                 'success': False,
                 'error': str(e)
@@ -459,16 +716,19 @@ class JiraService:
                     'error': 'Jira client not initialized'
                 }
             
-            issue = self.client.issue(ticket_key)
+            # jira-python streams the open file through a MultipartEncoder, and
+            # takes the key directly (an unknown key fails the upload with 404)
+            def _upload():
+                with open(file_path, 'rb') as f:
+                    return self.client.add_attachment(
+                        issue=ticket_key, 
+                        attachment=f,
+                        filename=filename
+                    )
             
-            with open(file_path, 'rb') as f:
-                attachment = self.client.add_attachment(
-                    issue=issue, 
-                    attachment=f,
-                    filename=filename
-                )
+            attachment = await self._call(_upload, idempotent=False)
             
-            print(f"✅ Attachment added to {ticket_key}: {filename or file_path}")
+            logger.info("✅ Attachment added to %s: %s", ticket_key, filename or file_path)
             return {
                 'success': True,
                 'ticket_key': ticket_key,
@@ -478,20 +738,20 @@ class JiraService:
             
         except JIRAError as e:
             error_msg = f"Jira API Error: {e.status_code}"
-            print(f"❌ Failed to add attachment to {ticket_key}: {error_msg}")
+            logger.error("❌ Failed to add attachment to %s: %s", ticket_key, error_msg)
             return {
                 'success': False,
                 'error': error_msg
             }
         except FileNotFoundError:
             error_msg = f"File not found: {file_path}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             return {
                 'success': False,
                 'error': error_msg
             }
         except Exception as e:
-            print(f"❌ Error adding attachment to {ticket_key}: {e}")
+            logger.error("❌ Error adding attachment to %s: %s", ticket_key, e)
             return {
                 'success': False,
                 'error': str(e)
@@ -507,29 +767,19 @@ class JiraService:
         """Search tickets by various criteria"""
         try:
             if not self.client:
-                print("❌ Jira client not initialized")
+                logger.error("❌ Jira client not initialized")
                 return []
             
-            # Build JQL query
-            jql_parts = []
-            
+            # Build JQL query (values quoted/escaped, phone formatting normalized)
             if user_phone:
-                jql_parts.append(f'(description ~ "{user_phone}" OR summary ~ "{user_phone}")')
+                user_phone = user_phone.translate(_PHONE_FORMATTING)
+            jql = _build_search_jql(user_phone or None, project_key or None, status or None)
             
-            if project_key:
-                jql_parts.append(f'project = {project_key}')
+            logger.debug("🔍 JQL Query: %s", jql)
             
-            if status:
-                jql_parts.append(f'status = "{status}"')
-            
-            if not jql_parts:
-                jql_parts.append('project IS NOT EMPTY')
-            
-            jql = ' AND '.join(jql_parts) + ' ORDER BY created DESC'
-            
-            print(f"🔍 JQL Query: {jql}")
-            
-            issues = self.client.search_issues(jql, maxResults=limit)
+            issues = await self._call(
+                self.client.search_issues, jql, maxResults=limit, fields=_SEARCH_FIELDS
+            )
             
             results = []
             for issue in issues:
@@ -539,21 +789,21 @@ class JiraService:
                         'summary': issue.fields.summary,
                         'status': issue.fields.status.name,
                         'priority': issue.fields.priority.name if issue.fields.priority else 'None',
-                        'created': issue.fields.created,
+                        'created': _fmt_jira_date(issue.fields.created),
                         'url': f"{settings.JIRA_HOST}/browse/{issue.key}"
                     })
                 except Exception as e:
-                    print(f"⚠️  Error parsing issue {issue.key}: {e}")
+                    logger.warning("⚠️ Error parsing issue %s: %s", issue.key, e)
                     continue
             
-            print(f"✅ Found {len(results)} tickets")
+            logger.debug("✅ Found %d tickets", len(results))
             return results
             
         except JIRAError as e:
-            print(f"❌ Failed to search tickets: {e.status_code} - {e.text}")
+            logger.error("❌ Failed to search tickets: %s - %s", e.status_code, e.text)
             return []
         except Exception as e:
-            print(f"❌ Error searching tickets: {e}")
+            logger.error("❌ Error searching tickets: %s", e)
             return []
     
     async def get_ticket_comments(self, ticket_key: str) -> List[Dict]:
@@ -562,8 +812,8 @@ class JiraService:
             if not self.client:
                 return []
             
-            issue = self.client.issue(ticket_key)
-            comments = self.client.comments(issue)
+            # comments() takes the key directly - no need to fetch the issue first
+            comments = await self._call(self.client.comments, ticket_key)
             
             result = []
             for comment in comments:
@@ -576,13 +826,13 @@ class JiraService:
                         'updated': comment.updated
                     })
                 except Exception as e:
-                    print(f"⚠️  Error parsing comment: {e}")
+                    logger.warning("⚠️ Error parsing comment: %s", e)
                     continue
             
             return result
             
         except Exception as e:
-            print(f"❌ Error fetching comments for {ticket_key}: {e}")
+            logger.error("❌ Error fetching comments for %s: %s", ticket_key, e)
             return []
 
 
@@ -3,12 +3,15 @@
 Identifies hot leads and prioritizes follow-up actions
 """
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 from enum import Enum
-from pydantic import BaseModel
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+import re
 
-from services.property_intelligence import PropertyRequirements, Timeline, Purpose
+from services.property_intelligence import (
+    PropertyRequirements, Timeline, Purpose, property_intelligence_service
+)
 
 # ==========================================
 # ENUMS & DATA MODELS
@@ -34,7 +37,17 @@ class AgentType(str, Enum):
     LEASING = "leasing"                       # Rental properties
     COMMERCIAL = "commercial"                 # Commercial properties
 
-class BANTScore(BaseModel):
+# Internal per-message scoring results - plain slotted dataclasses, no validation
+
+# A scoring reason: a fixed string, or a (%-template, *args) tuple that is only
+# formatted when someone reads BANTScore.reasoning
+Reason = Union[str, Tuple[Any, ...]]
+
+def _render_reason(reason: Reason) -> str:
+    return reason if isinstance(reason, str) else reason[0] % reason[1:]
+
+@dataclass(slots=True)
+class BANTScore:
     budget_score: int = 0      # 0-30 points
     authority_score: int = 0   # 0-25 points
     need_score: int = 0        # 0-25 points
@@ -42,24 +55,49 @@ class BANTScore(BaseModel):
     total_score: int = 0       # 0-100
     lead_type: LeadType = LeadType.UNQUALIFIED
     lead_priority: LeadPriority = LeadPriority.LOW
-    reasoning: List[str] = []
+    reasons: List[Reason] = field(default_factory=list)
     recommended_agent: AgentType = AgentType.GENERAL
-    calculated_at: datetime = None
+    calculated_at: datetime = field(default_factory=datetime.now)
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        if not self.calculated_at:
-            self.calculated_at = datetime.now()
+    @property
+    def reasoning(self) -> List[str]:
+        """Human-readable score breakdown"""
+        return [_render_reason(r) for r in self.reasons]
 
-class LeadAction(BaseModel):
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for export (reasons rendered as 'reasoning')"""
+        data = asdict(self)
+        del data["reasons"]
+        data["reasoning"] = self.reasoning
+        return data
+
+@dataclass(slots=True)
+class LeadAction:
     action: str
     priority: LeadPriority
-    suggested_sla_hours: int
+    suggested_sla_hours: float
     agent_type: AgentType
     message: str
     next_steps: List[str]
     escalate: bool = False
 
+# ==========================================
+# AUTHORITY PHRASES
+# ==========================================
+
+def _phrase_pattern(phrases: List[str]) -> "re.Pattern":
+    """One compiled alternation per phrase group (plain substring semantics)"""
+    return re.compile("|".join(re.escape(p) for p in phrases))
+
+# Decision-maker indicators (first matching group wins)
+_DIRECT_BUYER_RE = _phrase_pattern(['i am buying', 'i want to buy', 'i need', 'i am looking'])
+_FAMILY_DECISION_RE = _phrase_pattern(['we are', 'we want', 'my family', 'our family'])
+_REPRESENTATIVE_RE = _phrase_pattern(['my client', 'on behalf', 'representing'])
+
+# Buying-power indicators
+_INVESTOR_RE = _phrase_pattern(['investor', 'investment', 'portfolio', 'roi'])
+_CASH_BUYER_RE = _phrase_pattern(['cash buyer', 'cash payment', 'full payment'])
+
 # ==========================================
 # LEAD QUALIFICATION SERVICE
 # ==========================================
@@ -132,7 +170,7 @@ class LeadQualifier:
         # 4. TIMELINE SCORING (0-20 points)
         timeline_score = self.timeline_scores.get(property_requirements.timeline, 0)
         if timeline_score > 0:
-            reasoning.append(f"Timeline: {property_requirements.timeline.value} (+{timeline_score}pts)")
+            reasoning.append(("Timeline: %s (+%spts)", property_requirements.timeline.value, timeline_score))
         
         # CALCULATE TOTAL
         total_score = budget_score + authority_score + need_score + timeline_score
@@ -141,13 +179,13 @@ class LeadQualifier:
         if is_vip:
             bonus = min(10, 100 - total_score)  # Max 10 bonus points
             total_score += bonus
-            reasoning.append(f"VIP Client Bonus (+{bonus}pts)")
+            reasoning.append(("VIP Client Bonus (+%spts)", bonus))
         
         # BONUS: Negative sentiment penalty
         if sentiment_score and sentiment_score < -0.5:
             penalty = 5
             total_score = max(0, total_score - penalty)
-            reasoning.append(f"Frustrated customer penalty (-{penalty}pts)")
+            reasoning.append(("Frustrated customer penalty (-%spts)", penalty))
         
         # Classify lead type
         if total_score >= 80:
@@ -181,11 +219,11 @@ class LeadQualifier:
             total_score=total_score,
             lead_type=lead_type,
             lead_priority=lead_priority,
-            reasoning=reasoning,
+            reasons=reasoning,
             recommended_agent=recommended_agent
         )
     
-    def _score_budget(self, req: PropertyRequirements, reasoning: List[str]) -> int:
+    def _score_budget(self, req: PropertyRequirements, reasoning: List[Reason]) -> int:
         """Score budget clarity and feasibility (0-30 points)"""
         score = 0
         
@@ -209,8 +247,6 @@ class LeadQualifier:
         
         # Budget adequacy (0-15 points)
         if req.property_type and req.bedrooms is not None:
-            from services.property_intelligence import property_intelligence_service
-            
             # Get typical price range
             typical_min, typical_max = property_intelligence_service.get_price_range_for_property(
                 req.property_type,
@@ -255,20 +291,20 @@ class LeadQualifier:
         req: PropertyRequirements,
         context: Optional[Dict],
         is_vip: bool,
-        reasoning: List[str]
+        reasoning: List[Reason]
     ) -> int:
         """Score decision-making authority (0-25 points)"""
         score = 0
         message_lower = req.raw_message.lower()
         
         # Direct decision maker indicators (0-15 points)
-        if any(phrase in message_lower for phrase in ['i am buying', 'i want to buy', 'i need', 'i am looking']):
+        if _DIRECT_BUYER_RE.search(message_lower):
             score += 15
             reasoning.append("Authority: Direct buyer (+15pts)")
-        elif any(phrase in message_lower for phrase in ['we are', 'we want', 'my family', 'our family']):
+        elif _FAMILY_DECISION_RE.search(message_lower):
             score += 12
             reasoning.append("Authority: Family decision (+12pts)")
-        elif any(phrase in message_lower for phrase in ['my client', 'on behalf', 'representing']):
+        elif _REPRESENTATIVE_RE.search(message_lower):
             score += 6
             reasoning.append("Authority: Agent/Representative (+6pts)")
         else:
@@ -276,10 +312,10 @@ class LeadQualifier:
             reasoning.append("Authority: Assumed buyer (+10pts)")
         
         # Investor/High authority indicators (0-10 points)
-        if any(word in message_lower for word in ['investor', 'investment', 'portfolio', 'roi']):
+        if _INVESTOR_RE.search(message_lower):
             score += 10
             reasoning.append("Authority: Investor profile (+10pts)")
-        elif any(word in message_lower for word in ['cash buyer', 'cash payment', 'full payment']):
+        elif _CASH_BUYER_RE.search(message_lower):
             score += 8
             reasoning.append("Authority: Cash buyer (+8pts)")
         elif req.purpose == Purpose.INVEST:
@@ -293,14 +329,14 @@ class LeadQualifier:
         
         return min(score, 25)
     
-    def _score_need(self, req: PropertyRequirements, reasoning: List[str]) -> int:
+    def _score_need(self, req: PropertyRequirements, reasoning: List[Reason]) -> int:
         """Score clarity and strength of need (0-25 points)"""
         score = 0
         
         # Specific property type (0-8 points)
         if req.property_type:
             score += 8
-            reasoning.append(f"Need: Specific type ({req.property_type.value}) (+8pts)")
+            reasoning.append(("Need: Specific type (%s) (+8pts)", req.property_type.value))
         else:
             score += 2
             reasoning.append("Need: Type not specified (+2pts)")
@@ -308,18 +344,18 @@ class LeadQualifier:
         # Bedroom requirement (0-7 points)
         if req.bedrooms is not None:
             score += 7
-            reasoning.append(f"Need: Specific size ({req.bedrooms}BR) (+7pts)")
+            reasoning.append(("Need: Specific size (%sBR) (+7pts)", req.bedrooms))
         
         # Location preference (0-5 points)
         if req.locations:
             score += 5
-            reasoning.append(f"Need: Location(s) specified ({len(req.locations)}) (+5pts)")
+            reasoning.append(("Need: Location(s) specified (%s) (+5pts)", len(req.locations)))
         
         # Must-haves (0-5 points)
         if req.must_haves:
             points = min(5, len(req.must_haves))
             score += points
-            reasoning.append(f"Need: {len(req.must_haves)} must-haves (+{points}pts)")
+            reasoning.append(("Need: %s must-haves (+%spts)", len(req.must_haves), points))
         
         return min(score, 25)
     
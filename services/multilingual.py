@@ -12,6 +12,7 @@ from collections import OrderedDict
 
 from services.openai_service import openai_service
 from services.cost_tracker import cost_tracker
+from services._response_cache import TTLCache
 
 # ==========================================
 # ENUMS & DATA MODELS
@@ -53,27 +54,34 @@ class TranslationCache:
         self._cache: OrderedDict = OrderedDict()
         self._max_size = max_size
     
-    def _generate_key(self, text: str, source: str, target: str) -> str:
-        """Generate cache key"""
-        return f"{source}:{target}:{text[:100]}"
+    def _generate_key(self, text: str, source: str, target: str) -> Tuple[str, str, str]:
+        """
+        Generate cache key
+        
+        A tuple of the inputs - no string building, str hashes are cached on
+        the objects, and the full text is compared (no prefix collisions).
+        """
+        return (source, target, text)
     
     def get(self, text: str, source: str, target: str) -> Optional[str]:
         """Get cached translation"""
         key = self._generate_key(text, source, target)
         
-        if key in self._cache:
+        translation = self._cache.get(key)
+        if translation is not None:
             # Move to end (LRU)
             self._cache.move_to_end(key)
-            return self._cache[key]
         
-        return None
+        return translation
     
     def set(self, text: str, source: str, target: str, translation: str):
         """Store translation"""
         key = self._generate_key(text, source, target)
         
         # Remove oldest if at capacity
-        if len(self._cache) >= self._max_size:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        elif len(self._cache) >= self._max_size:
             self._cache.popitem(last=False)
         
         self._cache[key] = translation
@@ -92,6 +100,10 @@ class MultilingualService:
         # Translation cache
         self._cache = TranslationCache(max_size=500)
         
+        # Recently failed translations - retries within a minute return the
+        # original text instead of paying for another OpenAI call
+        self._failed = TTLCache(maxsize=2048, ttl=60)
+        
         # Arabic keywords for detection
         self._arabic_keywords = [
             'مرحبا', 'السلام', 'شكرا', 'عقار', 'فيلا', 'شقة', 
@@ -331,6 +343,19 @@ class MultilingualService:
                 cached=True
             )
         
+        # Recently failed - skip straight to the original-text fallback
+        failed_key = (source_language.value, target_language.value, text)
+        if self._failed.get(failed_key):
+            return TranslationResult(
+                original_text=text,
+                translated_text=text,
+                source_language=source_language,
+                target_language=target_language,
+                confidence=0.5,
+                quality=TranslationQuality.LOW,
+                cached=True
+            )
+        
         # Convert Arabish to Arabic first if needed
         if source_language == Language.MIXED:
             text = self._convert_arabish_to_arabic(text)
@@ -361,6 +386,7 @@ class MultilingualService:
             
         except Exception as e:
             print(f"❌ Translation error: {e}")
+            self._failed.set(failed_key, True)
             
             # Fallback to original text
             return TranslationResult(
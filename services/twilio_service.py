@@ -251,6 +251,14 @@ class TwilioService:
         """Placeholder for compatibility"""
         print("ℹ️ Twilio doesn't use circuit breaker")
         pass
+    
+    async def start(self):
+        """Placeholder for compatibility (no background workers)"""
+        pass
+    
+    async def shutdown(self):
+        """Placeholder for compatibility (nothing queued to flush)"""
+        pass
 
 
 # Create singleton instance
@@ -0,0 +1,143 @@
+"""
+Gallabox duplicate-send suppression tests
+Identical sends inside the dedup window must not reach the API, be billed
+or take any rate-limit slot
+"""
+
+import asyncio
+
+import pytest
+
+from services.cost_tracker import cost_tracker
+from services.gallabox_service import GallaboxService
+
+
+PHONE = "+971501234567"
+ENDPOINT = "/devapi/messages/whatsapp"
+
+
+def _payload(text: str = "Hello") -> dict:
+    return {
+        "channelType": "whatsapp",
+        "recipient": {"name": "User", "phone": PHONE},
+        "whatsapp": {"type": "text", "text": {"body": text}}
+    }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = GallaboxService()
+    posts = []
+    
+    async def fake_post(endpoint, payload, body, retry_count=None):
+        posts.append(body)
+        return {"success": True, "message_id": f"msg-{len(posts)}"}
+    
+    monkeypatch.setattr(service, "_post_with_retry", fake_post)
+    service.posts = posts
+    return service
+
+
+@pytest.fixture
+def billed(monkeypatch):
+    billed = []
+    monkeypatch.setattr(
+        cost_tracker, "track_gallabox_usage",
+        lambda kind, to: billed.append((kind, to))
+    )
+    return billed
+
+
+def test_identical_send_is_deduplicated(service):
+    async def run():
+        first = await service._make_api_call(ENDPOINT, _payload())
+        second = await service._make_api_call(ENDPOINT, _payload())
+        return first, second
+    
+    first, second = asyncio.run(run())
+    
+    assert first["success"] and not first.get("deduped")
+    assert second == {"success": True, "deduped": True, "status": "deduplicated"}
+    assert len(service.posts) == 1
+
+
+def test_different_payloads_are_both_sent(service):
+    async def run():
+        await service._make_api_call(ENDPOINT, _payload("Hello"))
+        return await service._make_api_call(ENDPOINT, _payload("Goodbye"))
+    
+    assert not asyncio.run(run()).get("deduped")
+    assert len(service.posts) == 2
+
+
+def test_failed_send_can_be_retried_immediately(service, monkeypatch):
+    async def failing_post(endpoint, payload, body, retry_count=None):
+        service.posts.append(body)
+        return {"success": False, "error": "boom"}
+    
+    monkeypatch.setattr(service, "_post_with_retry", failing_post)
+    
+    async def run():
+        await service._make_api_call(ENDPOINT, _payload())
+        return await service._make_api_call(ENDPOINT, _payload())
+    
+    assert not asyncio.run(run()).get("deduped")
+    assert len(service.posts) == 2
+
+
+def test_deduplicated_text_is_not_billed_or_rate_limited(service, billed):
+    async def run():
+        await service.send_text_message(PHONE, "Hello")
+        return await service.send_text_message(PHONE, "Hello")
+    
+    result = asyncio.run(run())
+    
+    assert result.get("deduped")
+    assert billed == [("text", PHONE)]
+    # Only the send that went out holds a per-user and a global slot
+    assert len(service._user_message_times[PHONE]) == 1
+    assert len(service._global_message_times) == 1
+
+
+def test_deduplicated_media_keeps_earlier_text_slot(service, billed):
+    async def run():
+        await service.send_text_message(PHONE, "Hello")
+        await service.send_image_message(PHONE, "https://example.com/a.jpg")
+        return await service.send_image_message(PHONE, "https://example.com/a.jpg")
+    
+    assert asyncio.run(run()).get("deduped")
+    assert len(service._user_message_times[PHONE]) == 2
+    assert len(billed) == 2
+
+
+def test_rate_limited_send_is_not_remembered(service):
+    service._rate_limit_max = 0
+    
+    async def run():
+        first = await service._make_api_call(ENDPOINT, _payload())
+        service._rate_limit_max = 1
+        second = await service._make_api_call(ENDPOINT, _payload())
+        return first, second
+    
+    first, second = asyncio.run(run())
+    
+    assert not first["success"]
+    assert second["success"] and not second.get("deduped")
+    assert len(service.posts) == 1
+
+
+def test_bulk_sends_are_not_deduplicated(service, monkeypatch):
+    async def bulk_post(endpoint, payload, body, retry_count=None):
+        service.posts.append(body)
+        return {"success": True, "data": {"messages": [{"id": "m1"}]}}
+    
+    monkeypatch.setattr(service, "_post_with_retry", bulk_post)
+    
+    async def run():
+        await service.send_bulk_text([(PHONE, "Hello")])
+        return await service.send_bulk_text([(PHONE, "Hello")])
+    
+    result = asyncio.run(run())
+    
+    assert result["results"] == [{"success": True, "message_id": "m1"}]
+    assert len(service.posts) == 2
@@ -0,0 +1,44 @@
+"""
+Gallabox send-log sampling tests
+Success logs are sampled once real send throughput crosses the threshold
+"""
+
+import logging
+
+import pytest
+
+from config.settings import settings
+from services.gallabox_service import GallaboxService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_SAMPLE_MPS_THRESHOLD", 20.0)
+    monkeypatch.setattr(settings, "LOG_SAMPLE_RATE", 10)
+    return GallaboxService()
+
+
+def _sent_logs(caplog):
+    return [r for r in caplog.records if r.getMessage().startswith("sent")]
+
+
+def test_low_throughput_logs_every_send(service, caplog):
+    caplog.set_level(logging.INFO, logger="services.gallabox_service")
+    
+    for i in range(5):
+        service._log_sent("sent %d", i)
+    
+    assert len(_sent_logs(caplog)) == 5
+
+
+def test_high_throughput_samples_send_logs(service, caplog):
+    caplog.set_level(logging.INFO, logger="services.gallabox_service")
+    
+    # 100 sends in the last ~1s window -> well above 20/s
+    service._sent_window_count = 100
+    service._sent_window_start -= 1.0
+    
+    for i in range(100):
+        service._log_sent("sent %d", i)
+    
+    assert len(_sent_logs(caplog)) == 10
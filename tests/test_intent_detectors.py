@@ -0,0 +1,80 @@
+"""
+Intent detector regression tests
+Keyword matching must keep substring semantics (plurals / inflections count)
+"""
+
+import pytest
+
+from services.intent_service import intent_service, _keyword_hits
+
+
+# Plural / inflected technical messages
+TECHNICAL_MESSAGES = [
+    "Getting errors on the website",
+    "I have issues logging in to Salesforce",
+    "Reports are loading slowly on the dashboards",
+    "Salesforce dashboard is not working",
+    "My laptop keyboard is broken",
+]
+
+
+@pytest.mark.parametrize("message", TECHNICAL_MESSAGES)
+def test_technical_query_detected(message):
+    assert intent_service._is_technical_query(message)
+
+
+@pytest.mark.parametrize("message", [
+    "Hello, how are you?",
+    "Thanks for your help",
+])
+def test_small_talk_is_not_technical(message):
+    assert not intent_service._is_technical_query(message)
+
+
+def test_keyword_hits_match_substrings():
+    hits = _keyword_hits("getting errors on the dashboards")
+    assert hits["technical"] == {"error", "dashboard"}
+    assert "error" in hits["problem"]
+
+
+def test_keyword_hits_count_overlapping_keywords():
+    # "data" is inside "database" - both are keywords, both count
+    hits = _keyword_hits("the database is down")
+    assert {"data", "database", "down"} <= hits["technical"]
+
+
+def test_new_issue_keywords_match_plurals():
+    hits = _keyword_hits("the reports on the dashboards show errors")
+    assert len(hits["new_issue"]) >= 2
+
+
+def test_confirm_and_cancel_match_whole_words_only():
+    assert "cancel" not in _keyword_hits("i know the report is late")
+    assert "confirm" not in _keyword_hits("salesforce sync failed")
+    assert "confirm" in _keyword_hits("yes please")
+    assert "cancel" in _keyword_hits("no thanks")
+
+
+@pytest.mark.parametrize("message", [
+    "Getting errors on the property listing website",
+    "I have issues with the villa reports",
+])
+def test_real_estate_excludes_plural_technical_messages(message):
+    assert not intent_service._is_real_estate_query(message)
+
+
+@pytest.mark.parametrize("message", [
+    "I want to buy a 3-bedroom villa",
+    "Show me apartments in Dubai Marina",
+])
+def test_real_estate_query_detected(message):
+    assert intent_service._is_real_estate_query(message)
+
+
+@pytest.mark.parametrize("message", [
+    "I need AI report for campaign",
+    "Dashboard for four seasons",
+    "Hello, how are you?",
+])
+def test_non_property_messages_are_not_real_estate(message):
+    assert not intent_service._is_real_estate_query(message)
@@ -0,0 +1,53 @@
+"""
+Sales redirect caching tests
+The keyword fast path and the routed property/viewing intents must share
+one redirect cache
+"""
+
+import asyncio
+
+import pytest
+
+from services import gallabox_service
+from services._response_cache import TTLCache
+from services.intent_service import intent_service
+from services.multilingual import multilingual_service
+
+
+PHONE = "+971501234567"
+
+
+@pytest.fixture
+def smart_responses(monkeypatch):
+    calls = []
+    
+    async def fake_smart_response(template, message, user_phone, **kwargs):
+        calls.append(template)
+        return f"redirect for {kwargs['name']}"
+    
+    async def fake_send(to, message, *args, **kwargs):
+        return {"success": True}
+    
+    monkeypatch.setattr(multilingual_service, "get_smart_response", fake_smart_response)
+    monkeypatch.setattr(gallabox_service, "send_text_message", fake_send)
+    monkeypatch.setattr(intent_service, "_redirect_cache", TTLCache(maxsize=16, ttl=300))
+    return calls
+
+
+def test_redirect_paths_share_cache(smart_responses):
+    async def run():
+        first = await intent_service._sales_redirect_message(PHONE, "Sara", "Book a viewing")
+        await intent_service._handle_sales_redirect("schedule_viewing", PHONE, "Sara", "Book a viewing")
+        return first
+    
+    assert asyncio.run(run()) == "redirect for Sara"
+    assert smart_responses == ["property_redirect"]
+
+
+def test_redirect_cache_is_per_name(smart_responses):
+    async def run():
+        await intent_service._sales_redirect_message(PHONE, "Sara", "I want to buy a villa")
+        return await intent_service._sales_redirect_message(PHONE, "Omar", "I want to buy a villa")
+    
+    assert asyncio.run(run()) == "redirect for Omar"
+    assert len(smart_responses) == 2